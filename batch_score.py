@@ -0,0 +1,189 @@
+"""
+Headless batch entry point: scores a folder (or .zip) of resumes against a job description without a browser session.
+
+Example:
+    python batch_score.py --jd "mydocs/Sample Intern JD.docx" --framework mydocs/SkillsFramework_Sample.xlsx \\
+        --resumes mydocs --output ranked.jsonl
+
+Several job descriptions can be given to --jd; each resume is then extracted once and scored against every
+requisition, writing the top candidates per JD (and optionally the full JD x candidate score matrix).
+
+The OpenAI API key is read from the PERSONAL_OPENAI_API_KEY (or OPENAI_API_KEY) environment variable,
+falling back to .streamlit/secrets.toml.
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import zipfile
+import pandas as pd
+from helper.file_handler import extract_text_from_docx
+from helper.skills_mapping import load_skills_future_framework, match_job_description
+from helper.skills_framework import SkillsFramework
+from helper.framework_pruning import LexicalIndex, DEFAULT_TOP_K
+from helper.skills_index import SkillsIndex, EMBEDDING_BACKENDS
+from helper.pipeline import run_pipeline, DEFAULT_QUEUE_SIZE
+from helper.bulk_resume_processor import DEFAULT_TIMEOUT, DEFAULT_PACK_TOKEN_BUDGET
+from helper.concurrency import DEFAULT_MAX_WORKERS
+from helper.instrumentation import RunMetrics, use_metrics
+from helper.cache import CandidateStore
+from helper.multi_jd import run_multi_jd_matching, top_candidates_per_jd
+
+RESUME_EXTENSIONS = (".docx", ".pdf")
+OUTPUT_FORMATS = ("jsonl", "csv", "parquet")
+
+def iter_resume_files(resumes_path):
+    """
+    Lazily yields resume files from a directory (searched recursively) or a .zip archive.
+    Each file is a binary file object with a .name attribute, as expected by the extraction stage.
+    """
+    if zipfile.is_zipfile(resumes_path):
+        with zipfile.ZipFile(resumes_path) as archive:
+            for member in sorted(archive.namelist()):
+                if member.lower().endswith(RESUME_EXTENSIONS) and not member.startswith("__MACOSX/"):
+                    resume_file = io.BytesIO(archive.read(member))
+                    resume_file.name = member
+                    yield resume_file
+        return
+
+    for root, _, file_names in sorted(os.walk(resumes_path)):
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith(RESUME_EXTENSIONS):
+                yield open(os.path.join(root, file_name), "rb")
+
+def candidate_row(candidate_info, score, file_name):
+    return {
+        "Candidate": candidate_info.get("Name", "Unknown Candidate"),
+        "Score": score,
+        "Qualification": candidate_info.get("Qualification", "N/A"),
+        "File": file_name,
+        "Skills": candidate_info.get("Skills", []),
+    }
+
+def score_single_jd(args, framework, framework_index, top_k):
+    """
+    Scores the resumes against one job description, streaming them through the pipeline. Returns (rows, failed count).
+    """
+    jd_matched_skills = match_job_description(extract_text_from_docx(args.jd[0]), framework, top_k, framework_index)
+    print(f"Matched {len(jd_matched_skills)} job description skills.", file=sys.stderr)
+
+    rows = []
+    failed = 0
+    processed = run_pipeline(
+        iter_resume_files(args.resumes), framework, jd_matched_skills,
+        llm_workers=args.llm_workers, extraction_workers=args.extraction_workers,
+        queue_size=args.queue_size, timeout=args.timeout, top_k=top_k, framework_index=framework_index,
+        pack_token_budget=args.pack_tokens, candidate_store=None if args.no_store else CandidateStore(),
+    )
+    for index, (resume_file, candidate_info, score, error) in enumerate(processed, start=1):
+        resume_file.close()
+        if error is not None:
+            failed += 1
+            print(f"Failed to process {resume_file.name}: {error}", file=sys.stderr)
+            continue
+        rows.append(candidate_row(candidate_info, score, resume_file.name))
+        if index % 50 == 0:
+            print(f"Processed {index} resumes...", file=sys.stderr)
+
+    rows.sort(key=lambda row: row["Score"], reverse=True)
+    return [dict(Rank=rank, **row) for rank, row in enumerate(rows, start=1)], failed
+
+def score_multiple_jds(args, framework, framework_index, top_k):
+    """
+    Extracts every resume once and scores it against all job descriptions. Returns (rows, failed count),
+    with the ranked candidates of each JD (the top --top-n if given).
+    """
+    job_descriptions = {jd_path: extract_text_from_docx(jd_path) for jd_path in args.jd}
+    results = run_multi_jd_matching(
+        job_descriptions, iter_resume_files(args.resumes), framework,
+        llm_workers=args.llm_workers, extraction_workers=args.extraction_workers,
+        queue_size=args.queue_size, timeout=args.timeout, top_k=top_k, framework_index=framework_index,
+        pack_token_budget=args.pack_tokens, candidate_store=None if args.no_store else CandidateStore(),
+    )
+    for name, error in results["failed"].items():
+        print(f"Failed to process {name}: {error}", file=sys.stderr)
+    print(f"Scored {len(results['candidates'])} candidates against {len(results['jd_skills'])} job descriptions.", file=sys.stderr)
+
+    if args.matrix:
+        results["scores"].to_csv(args.matrix, index_label="JD")
+
+    rows = []
+    for jd_path, ranked in top_candidates_per_jd(results["scores"], args.top_n).items():
+        for rank, (file_name, score) in enumerate(ranked, start=1):
+            rows.append(dict(JD=jd_path, Rank=rank, **candidate_row(results["candidates"][file_name], score, file_name)))
+    return rows, len(results["failed"])
+
+def write_results(rows, output_path, output_format):
+    """
+    Writes the ranked candidate rows as JSONL, CSV or Parquet.
+    """
+    if output_format == "jsonl":
+        with open(output_path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return
+
+    # Tabular formats store the nested skill list as a JSON string column
+    columns = ["Rank", "Candidate", "Score", "Qualification", "File", "Skills"]
+    if rows and "JD" in rows[0]:
+        columns.insert(0, "JD")
+    output_df = pd.DataFrame([dict(row, Skills=json.dumps(row["Skills"], ensure_ascii=False)) for row in rows], columns=columns)
+    if output_format == "csv":
+        output_df.to_csv(output_path, index=False)
+    else:
+        output_df.to_parquet(output_path, index=False)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score a folder or .zip of resumes against a job description.")
+    parser.add_argument("--jd", required=True, nargs="+", help="Job description file(s) (.docx); several JDs are scored against the same resumes.")
+    parser.add_argument("--framework", required=True, help="SkillsFuture Framework file (.xlsx).")
+    parser.add_argument("--resumes", required=True, help="Directory or .zip archive of resumes (.docx, .pdf).")
+    parser.add_argument("--output", required=True, help="Output file for the ranked results.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (inferred from the output extension if omitted).")
+    parser.add_argument("--llm-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent LLM calls.")
+    parser.add_argument("--extraction-workers", type=int, default=None, help="Text extraction processes (default: CPU count).")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Maximum items buffered between pipeline stages.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request LLM timeout in seconds.")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Framework rows sent to the LLM per prompt (0 sends all).")
+    parser.add_argument("--embedding-backend", choices=sorted(EMBEDDING_BACKENDS), default=None,
+                        help="Shortlist framework rows with the embedding index instead of TF-IDF (\"stub\" runs offline).")
+    parser.add_argument("--pack-tokens", type=int, nargs="?", const=DEFAULT_PACK_TOKEN_BUDGET, default=None,
+                        help=f"Pack short resumes into shared LLM requests of up to this many resume tokens (default when given: {DEFAULT_PACK_TOKEN_BUDGET}).")
+    parser.add_argument("--no-store", action="store_true", help="Re-extract every resume instead of reusing stored candidate profiles.")
+    parser.add_argument("--top-n", type=int, default=None, help="With several JDs, keep only the top N candidates per JD.")
+    parser.add_argument("--matrix", help="With several JDs, optional CSV path for the full JD x candidate score matrix.")
+    parser.add_argument("--metrics", help="Optional path for the JSON run metrics report.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_format = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if output_format not in OUTPUT_FORMATS:
+        sys.exit(f"Unknown output format '{output_format}'; use --format with one of {', '.join(OUTPUT_FORMATS)}.")
+    top_k = args.top_k or None
+
+    metrics = RunMetrics()
+    started = time.time()
+    with use_metrics(metrics):
+        framework = SkillsFramework(load_skills_future_framework(args.framework))
+        if args.embedding_backend:
+            framework_index = SkillsIndex.build(framework, backend=args.embedding_backend)
+        else:
+            framework_index = LexicalIndex(framework)
+        if len(args.jd) == 1:
+            rows, failed = score_single_jd(args, framework, framework_index, top_k)
+        else:
+            rows, failed = score_multiple_jds(args, framework, framework_index, top_k)
+
+    write_results(rows, args.output, output_format)
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.to_json())
+
+    print(f"Ranked {len(rows)} candidates ({failed} failed) in {time.time() - started:.1f}s -> {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
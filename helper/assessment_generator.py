@@ -1,18 +1,93 @@
-import json
-from helper.llm import get_completion
-from docx import Document
+import io
+import zipfile
+import tempfile
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+from helper.llm import get_structured_completion
+from helper.instrumentation import stage
+from helper.concurrency import run_concurrently, process_pool_context, DEFAULT_MAX_WORKERS
+from helper.skills_framework import proficiency_rank
 
-def generate_assessment_with_answers(jd_matched_skills):
+ANSWER_KEY_FILENAME = "Assessment_Answer_Key.docx"
+CANDIDATE_NAME_PLACEHOLDER = "{{CANDIDATE_NAME}}"
+
+# Version of the per-skill question prompt; bump it when the prompt changes so the question bank is regenerated
+QUESTION_PROMPT_VERSION = "1"
+
+@stage("assessment")
+def generate_skill_question(skill_name, proficiency_level):
+    """
+    Uses the LLM to generate one assessment question, with its answer, for a skill at a proficiency level.
+
+    Args:
+        skill_name (str): The skill being assessed.
+        proficiency_level (str): The proficiency level required for the job.
+
+    Returns:
+        dict: The question, answer, and skill.
+    """
+    prompt = f"""
+    Create one assessment question that tests a candidate's ability in the skill below at the required proficiency level.
+    Provide a brief answer for the question as part of an answer key.
+
+    Skill: {skill_name}
+    Required Proficiency Level: {proficiency_level}
+
+    Output the result as a JSON object with a "question" field, an "answer" field, and a "skill" field. Here is the format:
+    {{"question": "Question text", "answer": "Answer text", "skill": "{skill_name}"}}
+    """
+
+    from helper.schemas import AssessmentItem  # Deferred so importing this module stays fast
+    item = get_structured_completion(prompt, AssessmentItem)
+    item["skill"] = skill_name  # Keep the framework's skill name even if the model rephrased it
+    return item
+
+def assemble_assessment(jd_matched_skills, question_bank, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Assembles an assessment with one question per skill from the question bank. Only skills (at their required
+    proficiency level) without a stored question trigger LLM calls, which run in parallel, one per skill.
+
+    Args:
+        jd_matched_skills (list): List of skills relevant to the job description.
+        question_bank (QuestionBank): Store of generated questions.
+        max_workers (int): Maximum number of questions generated at the same time.
+
+    Returns:
+        list: List of dictionaries, each containing a question, answer, and skill, in the order of the skills.
+    """
+    skill_keys = list(dict.fromkeys(
+        (skill["Skill"], str(skill.get("Proficiency Level", "N/A"))) for skill in jd_matched_skills if isinstance(skill, dict)
+    ))
+    questions = {key: question_bank.get(*key, QUESTION_PROMPT_VERSION) for key in skill_keys}
+
+    missing_keys = [key for key, item in questions.items() if item is None]
+    for key, item, error in run_concurrently(lambda key: generate_skill_question(*key), missing_keys, max_workers=max_workers):
+        if error is not None:
+            print(f"Could not generate a question for {key[0]}:", error)  # Leave the skill out of this assessment
+            continue
+        question_bank.set(*key, QUESTION_PROMPT_VERSION, item)
+        questions[key] = item
+
+    return [questions[key] for key in skill_keys if questions[key] is not None]
+
+@stage("assessment")
+def generate_assessment_with_answers(jd_matched_skills, question_bank=None, max_workers=DEFAULT_MAX_WORKERS):
     """
     Uses LLM to generate a 5-question assessment with answers in JSON format.
     Each question includes the skill it assesses.
 
     Args:
         jd_matched_skills (list): List of skills relevant to the job description.
+        question_bank (QuestionBank, optional): If given, the assessment is assembled from cached per-skill questions
+            and only skills without one are generated (see assemble_assessment).
+        max_workers (int): Maximum number of per-skill questions generated at the same time.
 
     Returns:
         list: List of dictionaries, each containing a question, answer, and skill.
     """
+    if question_bank is not None:
+        return assemble_assessment(jd_matched_skills, question_bank, max_workers)
+
     prompt = f"""
     Based on the following skills required for the job, create an assessment with questions in JSON format. 
     Each question should assess the candidate's ability in each skill. Provide a brief answer for each question as part of an answer key, 
@@ -21,41 +96,120 @@ def generate_assessment_with_answers(jd_matched_skills):
     Skills Required:
     {', '.join([skill['Skill'] for skill in jd_matched_skills])}
 
-    Output the result in JSON format, with each object containing a "question" field, an "answer" field, and a "skill" field. Here is the format:
-    [
-      {{"question": "Question text 1", "answer": "Answer text 1", "skill": "Skill being assessed 1"}},
-      {{"question": "Question text 2", "answer": "Answer text 2", "skill": "Skill being assessed 2"}},
-      ...
-    ]
+    Output the result as a JSON object with a "questions" list, each entry containing a "question" field, an "answer" field, and a "skill" field. Here is the format:
+    {{
+      "questions": [
+        {{"question": "Question text 1", "answer": "Answer text 1", "skill": "Skill being assessed 1"}},
+        {{"question": "Question text 2", "answer": "Answer text 2", "skill": "Skill being assessed 2"}},
+        ...
+      ]
+    }}
     """
     
-    # Generate structured assessment from LLM
-    response = get_completion(prompt)
-     # Clean up the response to remove any extra formatting like ```json
-    response = response.strip("```json").strip("```").strip()
-    
-    assessment_data = json.loads(response)
+    from helper.schemas import Assessment  # Deferred so importing this module stays fast
+    # Generate structured assessment from LLM, validated against the Assessment schema
+    assessment_data = get_structured_completion(prompt, Assessment)
     
-    return assessment_data
+    return assessment_data["questions"]
 
-def create_candidate_docs(candidate_names, assessment_data):
+def assessment_filename(candidate_name):
     """
-    Creates a Word document for each candidate with the assessment questions only.
+    Returns the file name of a candidate's assessment document.
+    """
+    return f"{candidate_name.replace(' ', '_')}_Assessment.docx"
 
-    Args:
-        candidate_names (list): List of candidate names.
-        assessment_data (list): List of dictionaries, each containing a question and answer.
+def document_bytes(doc):
+    """
+    Serialises a Word document into bytes in memory.
+    """
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+class AssessmentTemplate:
+    """
+    Render once, clone many: the assessment document is built a single time with a placeholder in place of the
+    candidate's name, and each candidate's copy only substitutes the name in word/document.xml. Every other part of
+    the .docx package is compressed once into a skeleton package; a copy appends just its own document.xml to the
+    skeleton bytes, so it costs about as much as writing one small zip entry.
     """
-    for candidate_name in candidate_names:
+
+    def __init__(self, assessment_data):
+        """
+        Args:
+            assessment_data (list): List of dictionaries, each containing a question and answer.
+        """
+        from docx import Document  # Deferred so importing this module stays fast
+
         doc = Document()
-        doc.add_heading(f"Assessment for {candidate_name}", level=1)
+        doc.add_heading(f"Assessment for {CANDIDATE_NAME_PLACEHOLDER}", level=1)
         doc.add_paragraph("Please answer the following questions to the best of your ability.\n")
         
         for item in assessment_data:
             doc.add_paragraph(item["question"], style='List Number')
 
-        filename = f"{candidate_name.replace(' ', '_')}_Assessment.docx"
-        doc.save(filename)
+        skeleton = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(document_bytes(doc))) as package, \
+                zipfile.ZipFile(skeleton, "w", zipfile.ZIP_DEFLATED) as skeleton_package:
+            for info in package.infolist():
+                if info.filename == "word/document.xml":
+                    document_xml = package.read(info).decode("utf-8")
+                else:
+                    skeleton_package.writestr(info.filename, package.read(info))
+        self.skeleton = skeleton.getvalue()
+
+        # The heading comes first, so the first placeholder is the one in the heading even if a question contains it
+        self.document_prefix, _, self.document_suffix = document_xml.partition(CANDIDATE_NAME_PLACEHOLDER)
+
+    def render(self, candidate_name):
+        """
+        Returns the .docx bytes of the assessment for one candidate.
+        """
+        document_xml = self.document_prefix + escape(candidate_name) + self.document_suffix
+        buffer = io.BytesIO(self.skeleton)
+        # Append mode keeps the already compressed skeleton entries and only adds document.xml
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as package:
+            package.writestr("word/document.xml", document_xml)
+        return buffer.getvalue()
+
+def iter_candidate_docs(candidate_names, assessment_data, max_workers=None):
+    """
+    Builds a Word document for each candidate with the assessment questions only, entirely in memory.
+    The document is rendered once and cloned per candidate (see AssessmentTemplate).
+
+    Args:
+        candidate_names (list): List of candidate names.
+        assessment_data (list): List of dictionaries, each containing a question and answer.
+        max_workers (int, optional): If set, the copies are rendered in a process pool of this size.
+
+    Yields:
+        tuple: (file name, .docx bytes) for each candidate, in the order of candidate_names.
+    """
+    template = AssessmentTemplate(assessment_data)
+    if not max_workers:
+        for candidate_name in candidate_names:
+            yield assessment_filename(candidate_name), template.render(candidate_name)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context()) as executor:
+        # Large chunks so the template is pickled to the workers a few times rather than once per candidate
+        chunksize = max(1, len(candidate_names) // (max_workers * 4))
+        for candidate_name, content in zip(candidate_names, executor.map(template.render, candidate_names, chunksize=chunksize)):
+            yield assessment_filename(candidate_name), content
+
+def create_candidate_docs(candidate_names, assessment_data):
+    """
+    Creates a Word document for each candidate with the assessment questions only.
+    Nothing is written to disk, so concurrent sessions cannot overwrite each other's files.
+
+    Args:
+        candidate_names (list): List of candidate names.
+        assessment_data (list): List of dictionaries, each containing a question and answer.
+
+    Returns:
+        dict: .docx bytes keyed by file name.
+    """
+    return dict(iter_candidate_docs(candidate_names, assessment_data))
 
 def create_answer_key_doc(assessment_data):
     """
@@ -63,14 +217,175 @@ def create_answer_key_doc(assessment_data):
 
     Args:
         assessment_data (list): List of dictionaries, each containing a question, answer, and skill.
+
+    Returns:
+        bytes: The .docx file contents (saved as ANSWER_KEY_FILENAME in the zip archive).
     """
+    from docx import Document
+
     doc = Document()
     doc.add_heading("Assessment Answer Key", level=1)
+    _add_answer_key_items(doc, assessment_data)
+    
+    return document_bytes(doc)
 
+def _add_answer_key_items(doc, assessment_data):
     for i, item in enumerate(assessment_data, start=1):
         doc.add_paragraph(f"Q{i}. {item['question']}", style='List Number')
         doc.add_paragraph(f"Skill: {item['skill']}", style='List Bullet')  # Include skill being assessed
         doc.add_paragraph(f"Answer: {item['answer']}", style='List Bullet')
-    
-    doc.save("Assessment_Answer_Key.docx")
 
+def build_assessment_zip(candidate_names, assessment_data, spool_threshold=None, on_progress=None, max_workers=None):
+    """
+    Streams every candidate's assessment and the answer key straight into a zip archive without touching the disk.
+    Each document is written into the archive as soon as it is built, so only one document is held at a time.
+
+    Args:
+        candidate_names (list): List of candidate names.
+        assessment_data (list): List of dictionaries, each containing a question, answer, and skill.
+        spool_threshold (int, optional): If set, the archive is kept in a SpooledTemporaryFile that only moves
+            to a temporary file once it grows beyond this many bytes; otherwise it stays in a BytesIO.
+        on_progress (callable, optional): Called with (index, total, candidate_name) after each candidate document.
+        max_workers (int, optional): If set, candidate documents are rendered in a process pool of this size.
+
+    Returns:
+        file object: The zip archive, rewound to the start.
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=spool_threshold) if spool_threshold else io.BytesIO()
+    # .docx files are already compressed, so they are stored as they are
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:
+        for index, (filename, content) in enumerate(iter_candidate_docs(candidate_names, assessment_data, max_workers), start=1):
+            zip_file.writestr(filename, content)
+            if on_progress is not None:
+                on_progress(index, len(candidate_names), candidate_names[index - 1])
+        zip_file.writestr(ANSWER_KEY_FILENAME, create_answer_key_doc(assessment_data))
+    archive.seek(0)
+    return archive
+
+def skill_gaps(candidate_info, jd_matched_skills):
+    """
+    Returns the JD skills a candidate is missing or holds below the required proficiency level.
+    Skills are paired by name, as in scoring.
+
+    Args:
+        candidate_info (dict): The candidate's data with their matched skills.
+        jd_matched_skills (list): List of skills relevant to the job description.
+
+    Returns:
+        list: The JD skills the candidate should be assessed on.
+    """
+    candidate_levels = {}
+    for skill in candidate_info.get("Skills", []):
+        if isinstance(skill, dict):
+            candidate_levels.setdefault(skill["Skill"], skill.get("Proficiency Level"))  # First skill of each name, as in scoring
+
+    gaps = []
+    for jd_skill in jd_matched_skills:
+        if not isinstance(jd_skill, dict):
+            continue
+        required_level = jd_skill.get("Proficiency Level")
+        if jd_skill["Skill"] not in candidate_levels:
+            gaps.append(jd_skill)
+        elif candidate_levels[jd_skill["Skill"]] != required_level and \
+                proficiency_rank(candidate_levels[jd_skill["Skill"]]) < proficiency_rank(required_level):
+            gaps.append(jd_skill)
+    return gaps
+
+def generate_personalized_assessments(candidate_results, jd_matched_skills, question_bank=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Generates an assessment for each candidate that targets their skill gaps against the JD. Candidates with the
+    same gap set share one assessment, and distinct gap sets are generated concurrently with bounded parallelism.
+    A candidate without gaps gets the full JD assessment.
+
+    Args:
+        candidate_results (dict): Candidate data keyed by candidate name (e.g. the top N candidates).
+        jd_matched_skills (list): List of skills relevant to the job description.
+        question_bank (QuestionBank, optional): Store of per-skill questions; with it, every distinct skill is generated
+            at most once across all gap sets.
+        max_workers (int): Maximum number of LLM calls running at the same time.
+
+    Returns:
+        dict: Question lists keyed by candidate name; candidates sharing a gap set share the same list.
+    """
+    gap_sets = {}
+    candidate_gap_keys = {}
+    for candidate_name, candidate_info in candidate_results.items():
+        gaps = skill_gaps(candidate_info, jd_matched_skills) or list(jd_matched_skills)
+        gap_key = tuple((skill["Skill"], str(skill.get("Proficiency Level", "N/A"))) for skill in gaps if isinstance(skill, dict))
+        gap_sets.setdefault(gap_key, gaps)
+        candidate_gap_keys[candidate_name] = gap_key
+
+    if question_bank is not None:
+        # Fill the bank once for the union of all gaps (one parallel call per missing skill), then each gap set is
+        # assembled from stored questions without further LLM calls
+        all_gaps = [skill for gaps in gap_sets.values() for skill in gaps]
+        assemble_assessment(all_gaps, question_bank, max_workers)
+
+    def generate(item):
+        _, gaps = item
+        return generate_assessment_with_answers(gaps, question_bank=question_bank, max_workers=max_workers)
+
+    assessments = {}
+    for (gap_key, _), questions, error in run_concurrently(generate, gap_sets.items(), max_workers=max_workers):
+        if error is not None:
+            print("Could not generate a personalised assessment:", error)  # Those candidates are left out
+            continue
+        assessments[gap_key] = questions
+
+    return {
+        candidate_name: assessments[gap_key]
+        for candidate_name, gap_key in candidate_gap_keys.items()
+        if gap_key in assessments
+    }
+
+def create_combined_answer_key_doc(candidate_assessments):
+    """
+    Creates one answer key covering every personalised assessment, with a section per distinct question set
+    listing the candidates who received it.
+
+    Args:
+        candidate_assessments (dict): Question lists keyed by candidate name.
+
+    Returns:
+        bytes: The .docx file contents.
+    """
+    from docx import Document
+
+    question_sets = {}
+    for candidate_name, assessment_data in candidate_assessments.items():
+        question_sets.setdefault(id(assessment_data), (assessment_data, []))[1].append(candidate_name)
+
+    doc = Document()
+    doc.add_heading("Assessment Answer Key", level=1)
+    for set_number, (assessment_data, candidate_names) in enumerate(question_sets.values(), start=1):
+        doc.add_heading(f"Question Set {set_number}", level=2)
+        doc.add_paragraph(f"Candidates: {', '.join(candidate_names)}")
+        _add_answer_key_items(doc, assessment_data)
+
+    return document_bytes(doc)
+
+def build_personalized_assessment_zip(candidate_assessments, spool_threshold=None, on_progress=None):
+    """
+    Streams one personalised assessment per candidate and the combined answer key into a zip archive, in memory.
+    Each distinct question set is rendered once and cloned for the candidates who share it.
+
+    Args:
+        candidate_assessments (dict): Question lists keyed by candidate name, from generate_personalized_assessments.
+        spool_threshold (int, optional): If set, the archive spills to a temporary file above this many bytes.
+        on_progress (callable, optional): Called with (index, total, candidate_name) after each candidate document.
+
+    Returns:
+        file object: The zip archive, rewound to the start.
+    """
+    templates = {}
+    archive = tempfile.SpooledTemporaryFile(max_size=spool_threshold) if spool_threshold else io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:
+        for index, (candidate_name, assessment_data) in enumerate(candidate_assessments.items(), start=1):
+            if id(assessment_data) not in templates:
+                templates[id(assessment_data)] = AssessmentTemplate(assessment_data)
+            zip_file.writestr(assessment_filename(candidate_name), templates[id(assessment_data)].render(candidate_name))
+            if on_progress is not None:
+                on_progress(index, len(candidate_assessments), candidate_name)
+        zip_file.writestr(ANSWER_KEY_FILENAME, create_combined_answer_key_doc(candidate_assessments))
+    archive.seek(0)
+    return archive
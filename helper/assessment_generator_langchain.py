@@ -1,17 +1,18 @@
-import streamlit as st
-from langchain.chains import SequentialChain, LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
-from docx import Document
+from functools import lru_cache
+from helper.llm import get_api_key
 import json
 
-# Initialize the LangChain LLM
-llm = OpenAI(api_key=st.secrets["PERSONAL_OPENAI_API_KEY"])
+# LangChain, the LLM and the chains are only built on first use, so importing this module is cheap
+@lru_cache(maxsize=None)
+def get_llm():
+    """
+    Initializes the LangChain LLM.
+    """
+    from langchain.llms import OpenAI
+    return OpenAI(api_key=get_api_key())
 
 # Define prompt templates
-question_generation_prompt = PromptTemplate(
-    input_variables=["jd_matched_skills"],
-    template="""
+question_generation_template = """
     Based on the following skills required for the job, create an assessment with 5 questions. 
     Each question should assess the candidate's ability in one of the skills. 
 
@@ -25,11 +26,8 @@ question_generation_prompt = PromptTemplate(
       ...
     ]
     """
-)
 
-answer_generation_prompt = PromptTemplate(
-    input_variables=["questions"],
-    template="""
+answer_generation_template = """
     Based on the questions below, provide a brief answer for each question as part of an answer key. 
     Output the result in JSON format as follows:
     [
@@ -41,18 +39,28 @@ answer_generation_prompt = PromptTemplate(
     Questions:
     {questions}
     """
-)
 
-# Create individual LLMChains for each prompt
-question_chain = LLMChain(llm=llm, prompt=question_generation_prompt, output_key="questions")
-answer_chain = LLMChain(llm=llm, prompt=answer_generation_prompt, output_key="assessment_data")
+@lru_cache(maxsize=None)
+def get_sequential_chain():
+    """
+    Builds the question and answer LLMChains combined into a SequentialChain.
+    """
+    from langchain.chains import SequentialChain, LLMChain
+    from langchain.prompts import PromptTemplate
+
+    question_generation_prompt = PromptTemplate(input_variables=["jd_matched_skills"], template=question_generation_template)
+    answer_generation_prompt = PromptTemplate(input_variables=["questions"], template=answer_generation_template)
+
+    # Create individual LLMChains for each prompt
+    question_chain = LLMChain(llm=get_llm(), prompt=question_generation_prompt, output_key="questions")
+    answer_chain = LLMChain(llm=get_llm(), prompt=answer_generation_prompt, output_key="assessment_data")
 
-# Combine them into a SequentialChain
-sequential_chain = SequentialChain(
-    chains=[question_chain, answer_chain],
-    input_variables=["jd_matched_skills"],
-    output_variables=["assessment_data"]
-)
+    # Combine them into a SequentialChain
+    return SequentialChain(
+        chains=[question_chain, answer_chain],
+        input_variables=["jd_matched_skills"],
+        output_variables=["assessment_data"]
+    )
 
 def generate_assessment_with_answers(jd_matched_skills):
     """
@@ -69,7 +77,7 @@ def generate_assessment_with_answers(jd_matched_skills):
     skills_text = ', '.join([skill['Skill'] for skill in jd_matched_skills])
 
     # Run the sequential chain with skills_text as input
-    chain_output = sequential_chain({"jd_matched_skills": skills_text})
+    chain_output = get_sequential_chain()({"jd_matched_skills": skills_text})
 
     # Retrieve and parse the assessment data
     assessment_data_response = chain_output["assessment_data"]
@@ -86,6 +94,8 @@ def create_candidate_docs(candidate_names, assessment_data):
         candidate_names (list): List of candidate names.
         assessment_data (list): List of dictionaries, each containing a question and answer.
     """
+    from docx import Document  # Deferred so importing this module stays fast
+
     for candidate_name in candidate_names:
         doc = Document()
         doc.add_heading(f"Assessment for {candidate_name}", level=1)
@@ -104,6 +114,8 @@ def create_answer_key_doc(assessment_data):
     Args:
         assessment_data (list): List of dictionaries, each containing a question, answer, and skill.
     """
+    from docx import Document
+
     doc = Document()
     doc.add_heading("Assessment Answer Key", level=1)
 
@@ -1,123 +1,266 @@
-import PyPDF2
-from docx import Document  # python-docx for .docx processing
-from helper.llm import get_completion
-import json
+from helper.llm import get_structured_completion, count_tokens, model
+from helper.instrumentation import stage
+from helper.text_extraction import ExtractionPool
+from helper.concurrency import run_concurrently, DEFAULT_MAX_WORKERS
+from helper.framework_pruning import LexicalIndex, prune_framework
+from helper.skills_framework import as_skills_framework
 
-def extract_text_from_file(file):
-    """
-    Extracts text from a .docx or .pdf file.
+# Per-request timeout (in seconds) for the LLM skill matching call of a single resume
+DEFAULT_TIMEOUT = 120
+
+# Version of the resume matching prompt; bump it whenever the prompt changes so stored candidate profiles are re-extracted
+MATCHING_PROMPT_VERSION = "3"
+
+# Packing mode: short resumes share one request as long as their combined text fits this many tokens
+DEFAULT_PACK_TOKEN_BUDGET = 6000
+MAX_RESUMES_PER_PACK = 8
+
+MATCHING_INSTRUCTIONS = """extract the candidate's full name, qualifications and match their skills to the most relevant skills from the SkillsFuture Framework. You are not allowed to use or create your own 'Skill' and are to strictly use relevant skills from the SkillsFuture Framework.
     
-    Args:
-        file (UploadedFile): The resume file uploaded by the user.
-        
-    Returns:
-        str: Extracted text from the file.
-    """
-    if file.name.endswith('.docx'):
-        # Read .docx file
-        doc = Document(file)
-        return '\n'.join([para.text for para in doc.paragraphs])
-    elif file.name.endswith('.pdf'):
-        # Read .pdf file using PyPDF2
-        pdf_text = ""
-        pdf_reader = PyPDF2.PdfReader(file)  # Use PyPDF2 to read the PDF
-
-        # Loop through all the pages and extract text
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            if text:
-                pdf_text += text
-
-        # Return or use the extracted text as needed
-        return pdf_text
-    else:
-        raise ValueError("Unsupported file format")
-
-def match_candidate_skills(resume_text, framework_df):
+    Only match skills that have been mentioned anywhere in the resume. For example, do not assume that the candidate has "Communication" skill unless there is a phrase stating that "Possess good communication skill".
+
+    To determine the proficiency level that the candidate possesses, you will have to either find out how long they have studied the skill in school or how many years of experience they have with the skill through reading their job history. If it cannot be determined from the method above, you can make an educated guess, for example, if the candidate is a fresh graduate, skill profiency should not be at an advanced level. However, if the candidate has 10 years of experience in the field, skill proficiency should not be at a basic level."""
+
+CANDIDATE_OUTPUT_EXAMPLE = """{
+      "Name": "Candidate's full name",
+      "Qualification": "Extracted qualification information",
+      "Skills": [
+        {
+          "Skill": "Skill name from framework",
+          "Category": "Category name",
+          "Proficiency Level": "Proficiency level",
+          "Explanation": "The text from the resume you used to determine this data"
+        },
+        ...
+      ]
+    }"""
+
+def matching_prompt_version(top_k=None, framework_index=None):
+    """
+    Identifies everything besides the resume and framework that changes the extracted profile (prompt, model and pruning),
+    for keying the CandidateStore.
+    """
+    version = f"{MATCHING_PROMPT_VERSION}:{model}:top_k={top_k}"
+    # An embedding index shortlists different rows than the default lexical one
+    embedding_backend = getattr(framework_index, "backend", None)
+    if top_k is not None and embedding_backend is not None:
+        version += f":embedding={embedding_backend}"
+    return version
+
+def matching_system_prompt(framework_text, output_instructions):
+    """
+    Builds the system message for resume matching: fixed instructions, the output format and then the framework.
+    Only the resume text changes between requests, so with the full framework every request shares this prefix.
+    """
+    return f"""
+    Given a resume text, {MATCHING_INSTRUCTIONS}
+
+    {output_instructions}
+
+    SkillsFuture Framework (tab-separated, one skill and proficiency level per line):
+    <SkillsFuture_Framework>{framework_text}</SkillsFuture_Framework>
+    """
+
+@stage("resume_matching")
+def match_candidate_skills(resume_text, framework, timeout=None, top_k=None, framework_index=None):
     """
     Uses the LLM to match the resume text with relevant skills from the SkillsFuture Framework.
     
     Args:
         resume_text (str): The text extracted from a resume.
-        framework_df (DataFrame): The SkillsFuture Framework DataFrame.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework; pass a prebuilt SkillsFramework to avoid rebuilding it per resume.
+        timeout (float, optional): Per-request timeout in seconds for the LLM call.
+        top_k (int, optional): If set, only the top_k framework rows most relevant to the resume are sent to the LLM.
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
         
     Returns:
         dict: A structured output with the candidate's qualifications and matched skills.
+
+    Raises:
+        StructuredOutputError: If the LLM output does not match the CandidateProfile schema after a repair attempt.
     """
-    # Convert SkillsFuture Framework to a JSON-like format
-    framework_text = framework_df.to_dict(orient="records")
+    # Keep only the relevant part of the framework and use its compact tab-separated form
+    framework = prune_framework(resume_text, as_skills_framework(framework), top_k, framework_index)
+    framework_text = framework.prompt_text
     
-    # Craft the prompt to extract qualifications and map skills
+    # Craft the prompt to extract qualifications and map skills. The instructions and framework go first, in the system
+    # message, and the resume last, so requests share a long identical prefix that the provider can cache.
+    system_prompt = matching_system_prompt(framework_text, f"""Please output the result as a single JSON object as shown in the example:
+    {CANDIDATE_OUTPUT_EXAMPLE}""")
     prompt = f"""
-    Given the following resume text, extract the candidate's full name, qualifications and match their skills to the most relevant skills from the SkillsFuture Framework. You are not allowed to use or create your own 'Skill' and are to strictly use relevant skills from the SkillsFuture Framework.
-    
-    Only match skills that have been mentioned anywhere in the resume. For example, do not assume that the candidate has "Communication" skill unless there is a phrase stating that "Possess good communication skill".
-
-    To determine the proficiency level that the candidate possesses, you will have to either find out how long they have studied the skill in school or how many years of experience they have with the skill through reading their job history. If it cannot be determined from the method above, you can make an educated guess, for example, if the candidate is a fresh graduate, skill profiency should not be at an advanced level. However, if the candidate has 10 years of experience in the field, skill proficiency should not be at a basic level.
-    
     Resume Text:
     <resume_text>{resume_text}</resume_text>
-    
-    SkillsFuture Framework:
-    <SkillsFuture_Framework>{framework_text}</SkillsFuture_Framework>
-    
-    Please output the result in strict JSON format as shown in the example:
-    {{
-      "Name": "Candidate's full name",
-      "Qualification": "Extracted qualification information",
-      "Skills": [
-        {{
-          "Skill": "Skill name from framework",
-          "Category": "Category name",
-          "Proficiency Level": "Proficiency level",
-          "Explanation": "The text from the resume you used to determine this data"
-        }},
-        ...
-      ]
-    }}
     """
     
-    response = get_completion(prompt)
+    from helper.schemas import CandidateProfile  # Deferred so importing this module stays fast
+    # Invalid output is repaired for this resume only; if it stays invalid the error marks the file as failed
+    # instead of silently producing an "Unknown" candidate
+    return get_structured_completion(prompt, CandidateProfile, timeout=timeout, system_prompt=system_prompt)
 
-    # Clean up the response to remove any extra formatting like ```json
-    response = response.strip("```json").strip("```").strip()
 
-    #print("LLM Response:", response)
+def pack_resumes(resume_texts, token_budget=DEFAULT_PACK_TOKEN_BUDGET, max_per_pack=MAX_RESUMES_PER_PACK):
+    """
+    Groups resumes into packs whose combined token count fits the budget (first-fit decreasing bin packing).
+    A resume larger than the budget gets a pack of its own.
+
+    Args:
+        resume_texts (list): Extracted resume texts.
+        token_budget (int): Maximum combined resume tokens per pack.
+        max_per_pack (int): Maximum number of resumes per pack.
+
+    Returns:
+        list: Packs, each a list of indices into resume_texts.
+    """
+    token_counts = [count_tokens(text) for text in resume_texts]
+    packs = []
+    pack_tokens = []
+    for index in sorted(range(len(resume_texts)), key=lambda i: token_counts[i], reverse=True):
+        for pack_index, pack in enumerate(packs):
+            if len(pack) < max_per_pack and pack_tokens[pack_index] + token_counts[index] <= token_budget:
+                pack.append(index)
+                pack_tokens[pack_index] += token_counts[index]
+                break
+        else:
+            packs.append([index])
+            pack_tokens.append(token_counts[index])
+    return packs
+
+@stage("resume_matching")
+def match_packed_resumes(resume_texts, framework, timeout=None, top_k=None, framework_index=None):
+    """
+    Matches several resumes in a single LLM request, so the instructions and framework are sent once per pack.
+
+    Args:
+        resume_texts (list): Texts of the resumes in the pack.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        timeout (float, optional): Per-request timeout in seconds for the LLM call.
+        top_k (int, optional): If set, top_k framework rows per resume are sent to the LLM.
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
+
+    Returns:
+        list: Candidate info for each resume in order, or None where the response had no valid entry for it.
+    """
+    # The pruned framework has to cover every resume in the pack
+    framework = prune_framework("\n".join(resume_texts), as_skills_framework(framework), top_k and top_k * len(resume_texts), framework_index)
+    framework_text = framework.prompt_text
+    resumes_text = "\n".join(
+        f'<resume id="{resume_id}">{resume_text}</resume>' for resume_id, resume_text in enumerate(resume_texts, start=1)
+    )
+
+    system_prompt = matching_system_prompt(framework_text, f"""You may be given several resumes, each belonging to a different candidate; process every resume separately.
+    Please output a single JSON object with a "Candidates" list containing one entry per resume, keyed by the resume id:
+    {{"Candidates": [{{"Resume ID": "1", "Name": ..., "Qualification": ..., "Skills": [...]}}, ...]}}
+    Each entry follows this example:
+    {CANDIDATE_OUTPUT_EXAMPLE}""")
+    prompt = f"""
+    Resumes ({len(resume_texts)}):
+    {resumes_text}
+    """
 
-    try:
-        return json.loads(response)  # Attempt to parse JSON
-    except json.JSONDecodeError:
-        print("Invalid JSON response from LLM:", response)  # Log invalid response for debugging
-        return {
-            "Name": "Unknown",
-            "Qualification": "N/A",
-            "Skills": []
-        }
+    from helper.schemas import CandidateProfileBatch  # Deferred so importing this module stays fast
+    response = get_structured_completion(prompt, CandidateProfileBatch, max_tokens=1024 * len(resume_texts), timeout=timeout,
+                                         system_prompt=system_prompt)
 
+    candidates = {}
+    for candidate in response["Candidates"]:
+        candidates.setdefault(str(candidate.pop("Resume ID")).strip(), candidate)
+    return [candidates.get(str(resume_id)) for resume_id in range(1, len(resume_texts) + 1)]
 
-def process_bulk_resumes(resume_files, framework_df):
+def match_resume_batch(resume_texts, framework, timeout=None, top_k=None, framework_index=None, token_budget=DEFAULT_PACK_TOKEN_BUDGET):
+    """
+    Matches a batch of resumes, packing short ones into shared requests. Any resume missing from a packed
+    response, or from a pack whose request failed, falls back to its own single-resume request.
+
+    Args:
+        resume_texts (list): Extracted resume texts.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        timeout (float, optional): Per-request timeout in seconds for each LLM call.
+        top_k (int, optional): Number of framework rows sent to the LLM per resume (all rows if None).
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
+        token_budget (int): Maximum combined resume tokens per packed request.
+
+    Returns:
+        list: (candidate_info, error) for each resume in order; candidate_info is None if error is set.
+    """
+    framework = as_skills_framework(framework)
+    results = [None] * len(resume_texts)
+    for pack in pack_resumes(resume_texts, token_budget):
+        packed_results = [None] * len(pack)
+        if len(pack) > 1:
+            try:
+                packed_results = match_packed_resumes([resume_texts[index] for index in pack], framework, timeout, top_k, framework_index)
+            except Exception as error:
+                print(f"Packed request for {len(pack)} resumes failed, retrying them one by one:", error)
+
+        for index, candidate_info in zip(pack, packed_results):
+            if candidate_info is not None:
+                results[index] = (candidate_info, None)
+                continue
+            try:
+                results[index] = (match_candidate_skills(resume_texts[index], framework, timeout=timeout, top_k=top_k, framework_index=framework_index), None)
+            except Exception as error:
+                results[index] = (None, error)
+    return results
+
+
+def iter_processed_resumes(resume_files, framework, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, top_k=None, framework_index=None, extraction_workers=None):
+    """
+    Processes resumes concurrently and yields each result as soon as it completes.
+    Text extraction runs on a process pool (skipping files already in the extraction cache) while
+    LLM matching runs on threads, so parsing of later files overlaps with LLM calls for earlier ones.
+    A failure while processing one resume is yielded with that file and does not stop the rest of the batch.
+    
+    Args:
+        resume_files (list): List of resume files uploaded by the user.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        max_workers (int): Maximum number of resumes processed at the same time.
+        timeout (float, optional): Per-request timeout in seconds for each LLM call.
+        top_k (int, optional): Number of framework rows sent to the LLM per resume (all rows if None).
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index; a lexical index is built once if omitted.
+        extraction_workers (int, optional): Number of text extraction processes (defaults to the CPU count).
+        
+    Yields:
+        tuple: (resume_file, candidate_info, error) in completion order; candidate_info is None if error is set.
+    """
+    # Build the framework representation and candidate-generation index once for the whole batch rather than per resume
+    framework = as_skills_framework(framework)
+    if top_k is not None and framework_index is None:
+        framework_index = LexicalIndex(framework)
+
+    def process(job):
+        _, extraction = job
+        return match_candidate_skills(extraction.result(), framework, timeout=timeout, top_k=top_k, framework_index=framework_index)
+
+    with ExtractionPool(extraction_workers) as extraction_pool:
+        jobs = [(resume_file, extraction_pool.submit(resume_file)) for resume_file in resume_files]
+        for (resume_file, _), candidate_info, error in run_concurrently(process, jobs, max_workers=max_workers):
+            yield resume_file, candidate_info, error
+
+def process_bulk_resumes(resume_files, framework, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, top_k=None, extraction_workers=None):
     """
     Processes multiple resumes and generates a JSON output for each candidate's name, qualifications, and skills.
+    Resumes are processed concurrently; files that fail to process are logged and left out of the output.
     
     Args:
         resume_files (list): List of resume files uploaded by the user.
-        framework_df (DataFrame): The SkillsFuture Framework DataFrame.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        max_workers (int): Maximum number of resumes processed at the same time.
+        timeout (float, optional): Per-request timeout in seconds for each LLM call.
+        top_k (int, optional): Number of framework rows sent to the LLM per resume (all rows if None).
+        extraction_workers (int, optional): Number of text extraction processes (defaults to the CPU count).
         
     Returns:
         dict: A dictionary containing each candidate's data by their name.
     """
     candidate_data = {}
     
-    for resume_file in resume_files:
-        # Extract text from the resume
-        resume_text = extract_text_from_file(resume_file)
-        
-        # Match candidate's skills and extract name, qualifications, and skills using LLM
-        candidate_info = match_candidate_skills(resume_text, framework_df)
+    for resume_file, candidate_info, error in iter_processed_resumes(resume_files, framework, max_workers, timeout, top_k, extraction_workers=extraction_workers):
+        if error is not None:
+            print(f"Failed to process {resume_file.name}:", error)  # Log the failure and keep the rest of the batch
+            continue
         
         # Use extracted name as candidate identifier in the output
         candidate_name = candidate_info.get("Name", "Unknown Candidate")
         candidate_data[candidate_name] = candidate_info
     
     return candidate_data
-
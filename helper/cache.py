@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+# Local directory for all on-disk caches (can be overridden, e.g. for batch jobs)
+CACHE_DIR = os.environ.get("APP_CACHE_DIR", ".cache")
+
+# Defaults for the LLM completion cache
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite")
+LLM_CACHE_MAX_ENTRIES = 20000
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
+
+# Per-candidate skill extraction results, reused when only the job description changes
+CANDIDATE_STORE_PATH = os.path.join(CACHE_DIR, "candidates.sqlite")
+
+# Assessment questions per (skill, proficiency level), reused across assessments and requisitions
+QUESTION_BANK_PATH = os.path.join(CACHE_DIR, "question_bank.sqlite")
+
+def content_hash(data):
+    """
+    Returns a stable SHA-256 hex digest for bytes, strings, or JSON-serialisable objects.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def read_file_bytes(file):
+    """
+    Returns the raw bytes of a file path or file-like object (e.g. a Streamlit UploadedFile),
+    leaving file-like objects rewound so they can be read again.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    data = file.read()
+    file.seek(0)
+    return data
+
+class SQLiteStore:
+    """
+    Base class for the disk-backed (SQLite) stores: a connection shared between threads behind a lock,
+    hit/miss counters, clear() and stats(). Subclasses set the table name and the statements creating it,
+    and implement get() and set().
+    """
+
+    table = None
+    schema = ()
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        # Opened lazily so importing the module never touches the filesystem
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            for statement in self.schema:
+                self._conn.execute(statement)
+            self._conn.commit()
+        return self._conn
+
+    def clear(self):
+        """
+        Removes every stored entry and resets the counters.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns the hit/miss counters and the number of stored entries.
+        """
+        with self._lock:
+            entries = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+class CompletionCache(SQLiteStore):
+    """
+    Disk-backed (SQLite) cache for LLM completions, keyed on a hash of the request parameters.
+    Entries expire after ttl_seconds and the least recently used entries are evicted above max_entries.
+    """
+
+    table = "completions"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS completions ("
+        "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_accessed_at ON completions (accessed_at)",
+    )
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL_SECONDS):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(model, messages, temperature, top_p, max_tokens, response_format):
+        """
+        Builds the cache key from everything that can change the completion.
+        """
+        return content_hash({
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+        })
+
+    def get(self, key):
+        """
+        Returns the cached response for key, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        """
+        Stores a response and evicts expired and least recently used entries.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries:
+                conn.execute(
+                    "DELETE FROM completions WHERE key IN ("
+                    "SELECT key FROM completions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            conn.commit()
+
+class CandidateStore(SQLiteStore):
+    """
+    Disk-backed (SQLite) store of extracted candidate profiles, keyed by (resume hash, framework hash, prompt version).
+    Candidate skill extraction does not depend on the job description, so a stored profile can be rescored
+    against any JD without another LLM call. Bump the prompt version whenever the extraction prompt changes.
+    """
+
+    table = "candidates"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS candidates ("
+        "resume_hash TEXT NOT NULL, framework_hash TEXT NOT NULL, prompt_version TEXT NOT NULL, "
+        "candidate TEXT NOT NULL, created_at REAL NOT NULL, "
+        "PRIMARY KEY (resume_hash, framework_hash, prompt_version))",
+    )
+
+    def __init__(self, path=CANDIDATE_STORE_PATH):
+        super().__init__(path)
+
+    def get(self, resume_hash, framework_hash, prompt_version):
+        """
+        Returns the stored candidate profile, or None if this resume has not been extracted with this framework and prompt.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT candidate FROM candidates WHERE resume_hash = ? AND framework_hash = ? AND prompt_version = ?",
+                (resume_hash, framework_hash, prompt_version),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, resume_hash, framework_hash, prompt_version, candidate_info):
+        """
+        Stores an extracted candidate profile.
+        """
+        candidate = json.dumps(candidate_info, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO candidates (resume_hash, framework_hash, prompt_version, candidate, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (resume_hash, framework_hash, prompt_version, candidate, time.time()),
+            )
+            conn.commit()
+
+class QuestionBank(SQLiteStore):
+    """
+    Disk-backed (SQLite) bank of assessment questions keyed by (skill, proficiency level, prompt version),
+    so assessments for requisitions with overlapping skills reuse the questions already generated.
+    """
+
+    table = "questions"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS questions ("
+        "skill TEXT NOT NULL, proficiency_level TEXT NOT NULL, prompt_version TEXT NOT NULL, "
+        "item TEXT NOT NULL, created_at REAL NOT NULL, "
+        "PRIMARY KEY (skill, proficiency_level, prompt_version))",
+    )
+
+    def __init__(self, path=QUESTION_BANK_PATH):
+        super().__init__(path)
+
+    def get(self, skill, proficiency_level, prompt_version):
+        """
+        Returns the stored question item ({"question", "answer", "skill"}), or None if none was generated yet.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT item FROM questions WHERE skill = ? AND proficiency_level = ? AND prompt_version = ?",
+                (skill, proficiency_level, prompt_version),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, skill, proficiency_level, prompt_version, item):
+        """
+        Stores a question item for a skill and proficiency level.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO questions (skill, proficiency_level, prompt_version, item, created_at) VALUES (?, ?, ?, ?, ?)",
+                (skill, proficiency_level, prompt_version, json.dumps(item, ensure_ascii=False), time.time()),
+            )
+            conn.commit()
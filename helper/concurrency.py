@@ -0,0 +1,58 @@
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Default number of calls allowed in flight at once (LLM round-trips are I/O bound)
+DEFAULT_MAX_WORKERS = 8
+
+def process_pool_context():
+    """
+    Returns the multiprocessing context for process pools: forkserver where available, else the platform default.
+    Forking a multithreaded server (the LLM client loop, pipeline threads, SQLite locks) can copy a held lock
+    into the child and deadlock it, so workers start from a clean forkserver process instead.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None  # The platform default (spawn on Windows and macOS)
+
+def run_concurrently(func, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Runs a function over a list of items on a thread pool with a bounded number of calls in flight.
+    Results are yielded in completion order so callers can update progress as soon as each item finishes.
+    An exception raised for one item is returned alongside that item instead of aborting the whole batch.
+    Each call runs in a copy of the caller's context, so context variables (e.g. the instrumentation stage) carry over.
+
+    Args:
+        func (callable): Function called with a single item.
+        items (iterable): Items to process.
+        max_workers (int): Maximum number of calls running at the same time.
+
+    Yields:
+        tuple: (item, result, error) where exactly one of result or error is meaningful.
+    """
+    items = iter(items)
+    max_workers = max(1, int(max_workers))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        # Only keep max_workers calls submitted at once so large batches do not queue everything up front
+        def submit_next():
+            for item in items:
+                in_flight[executor.submit(contextvars.copy_context().run, func, item)] = item
+                return True
+            return False
+
+        for _ in range(max_workers):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as error:
+                    yield item, None, error
+                submit_next()
@@ -1,11 +1,12 @@
-import docx
-from helper.llm import get_completion
+from helper.llm import get_structured_completion, StructuredOutputError
+from helper.instrumentation import stage
 
 # Function to extract text from a .docx file
 def extract_text_from_docx(docx_file):
     """
     Extracts and returns text from a Word (.docx) file.
     """
+    import docx  # Deferred so importing this module stays fast
     doc = docx.Document(docx_file)
     full_text = []
     for para in doc.paragraphs:
@@ -13,6 +14,7 @@ def extract_text_from_docx(docx_file):
     return '\n'.join(full_text)
 
 # Function to call LLM for parsing the JD text
+@stage("jd_parsing")
 def parse_job_description(jd_text):
     """
     Sends the job description text to the LLM and returns the parsed output using advanced prompt techniques.
@@ -23,7 +25,7 @@ def parse_job_description(jd_text):
     2. Then, list the top 5 responsibilities mentioned.
     3. Next, list the required qualifications.
     4. Finally, extract the key skills required based on the top 5 responsibilities.
-    Return the result in the following structured format:
+    Return the result as a JSON object in the following structured format:
     {{
       "Job Title": "...",
       "Responsibilities": ["...", "...", "..."],
@@ -35,23 +37,24 @@ def parse_job_description(jd_text):
     {jd_text}
     """
     
-    response = get_completion(prompt)
-
+    from helper.schemas import ParsedJobDescription  # Deferred so importing this module stays fast
     try:
-        parsed_data = eval(response)  # Converts the response string to a dictionary (use with caution)
-    except:
+        parsed_data = get_structured_completion(prompt, ParsedJobDescription)
+    except StructuredOutputError as error:
+        print(error)
         parsed_data = {"Job Title": None, "Responsibilities": [], "Qualifications": [], "Skills": []}
     
     return parsed_data
 
 # Main function that runs the entire file handling and parsing flow
-def process_job_description_file(docx_file):
+def process_job_description_file(docx_file, parse=True):
     """
     Main function to handle file extraction and LLM parsing.
     This function extracts the text from the Word file and sends it to the LLM for parsing.
+    Pass parse=False when only the text is needed, to skip the parsing round-trip (the parsed output is then None).
     """
     jd_text = extract_text_from_docx(docx_file)
     
-    parsed_output = parse_job_description(jd_text)
+    parsed_output = parse_job_description(jd_text) if parse else None
     
     return jd_text, parsed_output
@@ -0,0 +1,120 @@
+import re
+from collections import Counter
+import numpy as np
+from helper.skills_index import framework_row_text
+from helper.skills_framework import SkillsFramework, as_skills_framework, framework_dataframe
+
+# Default number of framework rows kept per resume / job description prompt
+DEFAULT_TOP_K = 40
+
+_token_pattern = re.compile(r"[a-z0-9+#]+")
+
+def tokenize(text):
+    """
+    Lower-cases text and splits it into word tokens (keeping terms like C++ and C#).
+    """
+    return _token_pattern.findall(str(text).lower())
+
+class LexicalIndex:
+    """
+    TF-IDF index over the SkillsFuture Framework rows, built once per framework and used to select the
+    rows relevant to a resume or job description before prompting.
+    Stored sparsely as per-term postings (the rows containing each term and their normalised weights), so
+    memory grows with the framework text rather than rows x vocabulary, and scoring only touches the query's terms.
+    """
+
+    def __init__(self, framework):
+        self.framework_df = framework_dataframe(framework).reset_index(drop=True)
+        documents = [tokenize(framework_row_text(row)) for row in self.framework_df.to_dict(orient="records")]
+
+        self.vocabulary = {}
+        row_ids, term_ids, counts = [], [], []
+        for row, tokens in enumerate(documents):
+            for token, count in Counter(tokens).items():
+                row_ids.append(row)
+                term_ids.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                counts.append(count)
+        row_ids = np.array(row_ids, dtype=np.int32)
+        term_ids = np.array(term_ids, dtype=np.int32)
+
+        document_frequency = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)).astype(np.float32) + 1.0
+        weights = np.array(counts, dtype=np.float32) * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(row_ids, weights=weights * weights, minlength=len(documents))).astype(np.float32)
+        weights /= norms[row_ids]  # Every stored entry belongs to a row with a non-zero norm
+
+        # Postings grouped by term: the entries of term t are at _offsets[t]:_offsets[t + 1]
+        order = np.argsort(term_ids, kind="stable")
+        self._rows = row_ids[order]
+        self._weights = weights[order]
+        self._offsets = np.concatenate(([0], np.cumsum(document_frequency)))
+
+    def scores(self, text):
+        """
+        Returns the cosine similarity between the text and every framework row.
+        """
+        query = Counter(column for column in map(self.vocabulary.get, tokenize(text)) if column is not None)
+        scores = np.zeros(len(self.framework_df), dtype=np.float32)
+        if not query:
+            return scores
+        columns = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+        query_weights = np.fromiter(query.values(), dtype=np.float32, count=len(query)) * self.idf[columns]
+        query_weights /= np.linalg.norm(query_weights)
+        for column, query_weight in zip(columns, query_weights):
+            start, end = self._offsets[column], self._offsets[column + 1]
+            # A term appears at most once per row, so the row indices here are unique
+            scores[self._rows[start:end]] += self._weights[start:end] * query_weight
+        return scores
+
+    def shortlist(self, text, k=DEFAULT_TOP_K):
+        """
+        Returns the k framework rows most relevant to the text, in framework order.
+        """
+        if k >= len(self.framework_df):
+            return self.framework_df
+        top = np.argpartition(-self.scores(text), k - 1)[:k]
+        return self.framework_df.iloc[np.sort(top)]
+
+def prune_framework(text, framework, top_k=DEFAULT_TOP_K, index=None):
+    """
+    Selects only the framework rows relevant to a resume or job description, so prompts stop
+    carrying the whole SkillsFuture table.
+
+    Args:
+        text (str): The resume or job description text.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        top_k (int): Number of framework rows to keep (all rows if None or 0).
+        index (LexicalIndex or SkillsIndex, optional): Prebuilt index over the same framework; built on the fly if omitted.
+
+    Returns:
+        SkillsFramework or DataFrame: The pruned framework, of the same type as the input.
+    """
+    if not top_k or top_k >= len(framework):
+        return framework
+    index = index if index is not None else LexicalIndex(framework)
+    shortlisted_df = index.shortlist(text, top_k)
+    if isinstance(framework, SkillsFramework):
+        # The indexes keep row positions as the DataFrame index
+        return framework.subset(shortlisted_df.index)
+    return shortlisted_df
+
+def framework_token_savings(framework, pruned_framework):
+    """
+    Reports how many prompt tokens pruning saved, measured with count_tokens on the framework text sent to the LLM.
+
+    Args:
+        framework (SkillsFramework or DataFrame): The full SkillsFuture Framework.
+        pruned_framework (SkillsFramework or DataFrame): The pruned framework.
+
+    Returns:
+        dict: Full, pruned and saved token counts.
+    """
+    from helper.llm import count_tokens
+
+    full_tokens = count_tokens(as_skills_framework(framework).prompt_text)
+    pruned_tokens = count_tokens(as_skills_framework(pruned_framework).prompt_text)
+    return {
+        "full_tokens": full_tokens,
+        "pruned_tokens": pruned_tokens,
+        "saved_tokens": full_tokens - pruned_tokens,
+    }
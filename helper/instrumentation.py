@@ -0,0 +1,137 @@
+import json
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Upper bounds (in seconds) of the LLM latency histogram buckets; the last bucket catches everything slower
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+_current_stage = contextvars.ContextVar("llm_stage", default="other")
+
+def _empty_stage():
+    return {
+        "calls": 0,
+        "api_calls": 0,
+        "cache_hits": 0,
+        "errors": 0,
+        "retries": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "prompt_tokens_saved_by_cache": 0,
+        "total_latency_seconds": 0.0,
+        "max_latency_seconds": 0.0,
+        "latency_histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+class RunMetrics:
+    """
+    Thread-safe collector of per-stage LLM usage for one run: token counts, latency histograms,
+    retries, errors and cache hits. report() returns a JSON-serialisable summary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.stages = {}
+
+    def _stage(self, stage_name):
+        return self.stages.setdefault(stage_name, _empty_stage())
+
+    def record_call(self, stage_name, latency, prompt_tokens=0, completion_tokens=0, cached=False, error=False, cached_prompt_tokens=0):
+        """
+        Records one completion request (served from the API or from the local cache).
+        """
+        with self._lock:
+            stats = self._stage(stage_name)
+            stats["calls"] += 1
+            if error:
+                stats["errors"] += 1
+            if cached:
+                # Tokens that would have been sent had the response not been cached
+                stats["cache_hits"] += 1
+                stats["prompt_tokens_saved_by_cache"] += prompt_tokens
+            else:
+                stats["api_calls"] += 1
+                stats["prompt_tokens"] += prompt_tokens
+                stats["completion_tokens"] += completion_tokens
+                stats["cached_prompt_tokens"] += cached_prompt_tokens
+                stats["total_latency_seconds"] += latency
+                stats["max_latency_seconds"] = max(stats["max_latency_seconds"], latency)
+                stats["latency_histogram"][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_retry(self, stage_name):
+        """
+        Records a retried request (e.g. after a rate limit or server error).
+        """
+        with self._lock:
+            self._stage(stage_name)["retries"] += 1
+
+    def report(self):
+        """
+        Returns the per-stage metrics and run totals as a JSON-serialisable dictionary.
+        """
+        with self._lock:
+            stages = {name: dict(stats, latency_histogram=list(stats["latency_histogram"])) for name, stats in self.stages.items()}
+
+        bucket_labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        for stats in stages.values():
+            stats["mean_latency_seconds"] = stats["total_latency_seconds"] / stats["api_calls"] if stats["api_calls"] else 0.0
+            stats["latency_histogram"] = dict(zip(bucket_labels, stats["latency_histogram"]))
+
+        totals = {key: sum(stats[key] for stats in stages.values()) for key in (
+            "calls", "api_calls", "cache_hits", "errors", "retries", "prompt_tokens", "completion_tokens",
+            "cached_prompt_tokens", "prompt_tokens_saved_by_cache", "total_latency_seconds",
+        )}
+        return {
+            "elapsed_seconds": time.time() - self.started_at,
+            "totals": totals,
+            "stages": stages,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.report(), indent=indent)
+
+# Process-wide default collector; a run can collect into its own instance with use_metrics()
+run_metrics = RunMetrics()
+_current_metrics = contextvars.ContextVar("run_metrics", default=run_metrics)
+
+def current_metrics():
+    """
+    Returns the metrics collector active in the current context.
+    """
+    return _current_metrics.get()
+
+def current_stage():
+    """
+    Returns the name of the pipeline stage active in the current context.
+    """
+    return _current_stage.get()
+
+@contextmanager
+def use_metrics(metrics):
+    """
+    Collects LLM metrics into the given RunMetrics for the duration of the block (e.g. one Streamlit session's run).
+    """
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+@contextmanager
+def stage(stage_name):
+    """
+    Attributes LLM calls made inside the block to a pipeline stage. Also usable as a function decorator.
+    """
+    token = _current_stage.set(stage_name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
@@ -1,62 +1,209 @@
 import os
-from openai import OpenAI
-import tiktoken
-import streamlit as st
+import time
+from functools import lru_cache
+from helper.cache import CompletionCache
+from helper.instrumentation import current_metrics, current_stage
 
-# Pass the API Key to the OpenAI Client
-api_key = st.secrets["PERSONAL_OPENAI_API_KEY"]
-client = OpenAI(api_key=api_key)
+# The API key, clients and tokenizer are all created on first use, so importing this module is cheap
+# and works without secrets (e.g. offline tools and tests that never call the API).
+
+def get_api_key():
+    """
+    Returns the OpenAI API key from the environment (for headless batch runs) or from Streamlit secrets.
+    """
+    api_key = os.environ.get("PERSONAL_OPENAI_API_KEY") or os.environ.get("OPENAI_API_KEY")
+    if api_key:
+        return api_key
+    import streamlit as st
+    return st.secrets["PERSONAL_OPENAI_API_KEY"]
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    Returns the synchronous OpenAI client (used for embeddings).
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=get_api_key(), base_url=os.environ.get("LLM_BASE_URL"))
+
+@lru_cache(maxsize=None)
+def get_llm_client():
+    """
+    Returns the pooled async client used for completions (rate limiting, retries, optional hedging).
+    LLM_BASE_URL points it at another endpoint, e.g. a local stub server in tests.
+    """
+    from helper.llm_client import AsyncLLMClient
+    return AsyncLLMClient(
+        api_key=get_api_key,
+        base_url=os.environ.get("LLM_BASE_URL"),
+        hedge_after=float(os.environ["LLM_HEDGE_AFTER"]) if os.environ.get("LLM_HEDGE_AFTER") else None,
+    )
 
 model = "gpt-4o-mini"
 emb_model = "text-embedding-3-small"
 
+# Local cache of completions; set LLM_CACHE_DISABLED=1 (or pass use_cache=False) to always call the API
+completion_cache = CompletionCache()
+cache_enabled = os.environ.get("LLM_CACHE_DISABLED", "0") != "1"
+
 def get_embedding(input, model=emb_model):
-    response = client.embeddings.create(
+    response = get_client().embeddings.create(
         input=input,
         model=model
     )
     return [x.embedding for x in response.data]
 
+def _cached_prompt_tokens(usage):
+    # openai==1.27.0 predates prompt_tokens_details, so the field arrives as a plain dict of extra data
+    prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(prompt_tokens_details, dict):
+        return prompt_tokens_details.get("cached_tokens") or 0
+    return getattr(prompt_tokens_details, "cached_tokens", None) or 0
+
+def _create_completion(messages, model, temperature, top_p, max_tokens, response_format=None, timeout=None, use_cache=True, cache_if=None):
+    """
+    Calls the chat completions API, serving repeated identical requests from the local completion cache.
+    Every call is recorded (tokens, latency, cache hit) against the active instrumentation stage.
+    If cache_if is given, only answers for which it returns True are written to the cache.
+    """
+    metrics = current_metrics()
+    stage_name = current_stage()
+    started = time.perf_counter()
+    estimated_prompt_tokens = count_tokens_from_message(messages)
+
+    use_cache = use_cache and cache_enabled
+    if use_cache:
+        cache_key = CompletionCache.make_key(model, messages, temperature, top_p, max_tokens, response_format)
+        cached_response = completion_cache.get(cache_key)
+        if cached_response is not None:
+            metrics.record_call(stage_name, time.perf_counter() - started, estimated_prompt_tokens, cached=True)
+            return cached_response
+
+    # Only override the client's default timeout when a per-request timeout (in seconds) is given
+    request_options = {"timeout": timeout} if timeout is not None else {}
+
+    try:
+        response = get_llm_client().complete( #originally was openai.chat.completions
+            token_estimate=estimated_prompt_tokens + max_tokens,
+            on_retry=lambda: metrics.record_retry(stage_name),
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            n=1,
+            response_format=response_format,
+            **request_options,
+        )
+    except Exception:
+        metrics.record_call(stage_name, time.perf_counter() - started, estimated_prompt_tokens, error=True)
+        raise
+    content = response.choices[0].message.content
+
+    usage = response.usage
+    # Prompt tokens the provider served from its prompt cache (a shared prefix of at least 1024 tokens)
+    metrics.record_call(
+        stage_name,
+        time.perf_counter() - started,
+        usage.prompt_tokens if usage else estimated_prompt_tokens,
+        usage.completion_tokens if usage else 0,
+        cached_prompt_tokens=_cached_prompt_tokens(usage),
+    )
+
+    # Only cache complete answers so a truncated response is retried next time
+    if use_cache and content is not None and response.choices[0].finish_reason == "stop":
+        if cache_if is None or cache_if(content):
+            completion_cache.set(cache_key, content)
+    return content
+
 # This is the "Updated" helper function for calling LLM
-def get_completion(prompt, model=model, temperature=0, top_p=1.0, max_tokens=1024, n=1, json_output=False):
+def get_completion(prompt, model=model, temperature=0, top_p=1.0, max_tokens=1024, n=1, json_output=False, timeout=None, use_cache=True):
     if json_output == True:
       output_json_structure = {"type": "json_object"}
     else:
       output_json_structure = None
 
     messages = [{"role": "user", "content": prompt}]
-    response = client.chat.completions.create( #originally was openai.chat.completions
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        n=1,
-        response_format=output_json_structure,
-    )
-    return response.choices[0].message.content
+    return _create_completion(messages, model, temperature, top_p, max_tokens, output_json_structure, timeout, use_cache)
 
 # Note that this function directly take in "messages" as the parameter.
-def get_completion_by_messages(messages, model=model, temperature=0, top_p=1.0, max_tokens=1024, n=1):
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        n=1
-    )
-    return response.choices[0].message.content
+def get_completion_by_messages(messages, model=model, temperature=0, top_p=1.0, max_tokens=1024, n=1, json_output=False, timeout=None, use_cache=True):
+    output_json_structure = {"type": "json_object"} if json_output else None
+    return _create_completion(messages, model, temperature, top_p, max_tokens, output_json_structure, timeout, use_cache)
+
+class StructuredOutputError(ValueError):
+    """
+    Raised when the LLM still returns JSON that does not match the expected schema after the repair attempts.
+    """
+
+def _parse_structured(response, schema):
+    from helper.schemas import decode_json, to_output_dict
+    return to_output_dict(schema.model_validate(decode_json(response)))
+
+def _is_valid_structured(response, schema):
+    try:
+        _parse_structured(response, schema)
+    except ValueError:
+        return False
+    return True
+
+def get_structured_completion(prompt, schema, model=model, max_tokens=1024, timeout=None, repair_attempts=1, use_cache=True, system_prompt=None):
+    """
+    Gets a JSON-mode completion and validates it against a pydantic schema.
+    If the output is malformed, only this request is retried: the invalid answer and the validation
+    error are sent back so the model corrects that one object, instead of the whole batch being rerun.
+
+    Args:
+        prompt (str): The prompt; it (or the system prompt) must ask for a single JSON object (required by JSON mode).
+        schema (type): Pydantic model from helper.schemas describing the expected object.
+        model (str): Model name.
+        max_tokens (int): Maximum tokens of the answer.
+        timeout (float, optional): Per-request timeout in seconds.
+        repair_attempts (int): Number of repair requests before giving up.
+        use_cache (bool): Whether the completion cache may be used.
+        system_prompt (str, optional): Fixed instructions and context sent before the prompt. Keeping everything that
+            does not change between requests here lets the provider reuse its cached prompt prefix.
+
+    Returns:
+        dict or list: The validated output, using the keys from the prompt.
+
+    Raises:
+        StructuredOutputError: If the output is still invalid after the repair attempts.
+    """
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt is not None:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    response_format = {"type": "json_object"}
+    # Only answers that validate are cached, so a malformed answer is never replayed from the cache
+    cache_if = lambda content: _is_valid_structured(content, schema)
+    response = _create_completion(messages, model, 0, 1.0, max_tokens, response_format, timeout, use_cache, cache_if)
+    for attempt in range(repair_attempts + 1):
+        try:
+            return _parse_structured(response, schema)
+        except ValueError as error:  # Covers both orjson.JSONDecodeError and pydantic's ValidationError
+            if attempt >= repair_attempts:
+                raise StructuredOutputError(f"Invalid {schema.__name__} output from LLM: {error}") from error
+            print(f"Repairing invalid {schema.__name__} output from LLM:", error)
+            messages = messages + [
+                {"role": "assistant", "content": response or ""},
+                {"role": "user", "content": f"That output is not valid: {error}\nReturn only the corrected JSON object, keeping every valid field unchanged."},
+            ]
+            response = _create_completion(messages, model, 0, 1.0, max_tokens, response_format, timeout, use_cache, cache_if)
 
 # This function is for calculating the tokens given the "message"
 # ⚠️ This is simplified implementation that is good enough for a rough estimation
 
+# The encoder is loaded once and reused, since building it is far slower than encoding a prompt
+@lru_cache(maxsize=None)
+def get_encoding(model_name='gpt-4o-mini'):
+    import tiktoken
+    return tiktoken.encoding_for_model(model_name)
+
 def count_tokens(text):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
+    encoding = get_encoding()
     return len(encoding.encode(text))
 
 
 def count_tokens_from_message(messages):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
+    encoding = get_encoding()
     value = ' '.join([x.get('content') for x in messages])
     return len(encoding.encode(value))
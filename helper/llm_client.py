@@ -0,0 +1,195 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+# Defaults for the shared client; override with environment variables to match the account's limits
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", 500))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", 200000))
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 32))
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+
+# Errors worth retrying: rate limits, server errors, timeouts and dropped connections
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APITimeoutError, openai.APIConnectionError)
+
+class TokenBucket:
+    """
+    Async token-bucket limiter: holds up to capacity tokens and refills at capacity per period seconds.
+    """
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount=1):
+        """
+        Waits until amount tokens are available and takes them. Requests larger than the bucket take the whole bucket.
+        """
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+def _is_retryable(error):
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def _retry_delay(error, attempt, base_delay, max_delay):
+    # Honour the server's Retry-After hint when present, otherwise use jittered exponential backoff
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), max_delay)
+    except ValueError:
+        pass
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+class AsyncLLMClient:
+    """
+    Async chat completions client over a pooled httpx connection, with request/token rate limiting,
+    jittered exponential retries on 429/5xx, and optional request hedging for tail latency.
+    Runs its own event loop on a background thread so synchronous code can call complete().
+    """
+
+    def __init__(self, api_key=None, base_url=None, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, hedge_after=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, transport=None):
+        """
+        Args:
+            api_key (str or callable): API key, or a function returning it (resolved on first request).
+            base_url (str, optional): Alternative endpoint, e.g. a local stub server in tests.
+            requests_per_minute (int): Request rate limit.
+            tokens_per_minute (int): Token rate limit (prompt estimate plus max_tokens per request).
+            max_retries (int): Retries after a rate limit or server error.
+            base_delay (float): Initial backoff delay in seconds.
+            max_delay (float): Maximum backoff delay in seconds.
+            hedge_after (float, optional): Seconds after which a duplicate request is sent if the first has not returned.
+            max_connections (int): Size of the HTTP connection pool.
+            transport (httpx.AsyncBaseTransport, optional): Custom transport, e.g. httpx.MockTransport for offline tests.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client = None
+        self._loop = None
+        self._request_bucket = None
+        self._token_bucket = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        # The event loop, HTTP pool and limiters are created on first use and live on one background thread
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client-loop", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def _get_client(self):
+        if self._client is None:
+            api_key = self.api_key() if callable(self.api_key) else self.api_key
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                transport=self.transport,
+            )
+            self._client = AsyncOpenAI(api_key=api_key, base_url=self.base_url, http_client=http_client, max_retries=0)
+            self._request_bucket = TokenBucket(self.requests_per_minute)
+            self._token_bucket = TokenBucket(self.tokens_per_minute)
+        return self._client
+
+    async def _attempt(self, token_estimate, request):
+        client = self._get_client()
+        await self._request_bucket.acquire(1)
+        await self._token_bucket.acquire(token_estimate)
+        return await client.chat.completions.create(**request)
+
+    async def _hedged_attempt(self, token_estimate, request):
+        if not self.hedge_after:
+            return await self._attempt(token_estimate, request)
+
+        primary = asyncio.ensure_future(self._attempt(token_estimate, request))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        # The first request is slow: race a duplicate and keep whichever succeeds first
+        pending = {primary, asyncio.ensure_future(self._attempt(token_estimate, request))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def acreate(self, token_estimate=0, on_retry=None, **request):
+        """
+        Creates a chat completion with rate limiting, retries and hedging.
+
+        Args:
+            token_estimate (int): Estimated tokens used by the request, charged against the token rate limit.
+            on_retry (callable, optional): Called once before every retry (e.g. to record metrics).
+            **request: Arguments for chat.completions.create (model, messages, temperature, ...).
+
+        Returns:
+            ChatCompletion: The API response.
+
+        Raises:
+            TimeoutError: If a timeout was given and the request, including retries and backoff, did not finish in time.
+        """
+        timeout = request.get("timeout")
+        if not isinstance(timeout, (int, float)):
+            return await self._create_with_retries(token_estimate, on_retry, request)
+        # The per-request timeout bounds the whole call, so timed-out attempts are not retried past it
+        try:
+            return await asyncio.wait_for(self._create_with_retries(token_estimate, on_retry, request), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"LLM request did not complete within {timeout}s") from None
+
+    async def _create_with_retries(self, token_estimate, on_retry, request):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._hedged_attempt(token_estimate, request)
+            except Exception as error:
+                if attempt >= self.max_retries or not _is_retryable(error):
+                    raise
+                if on_retry is not None:
+                    on_retry()
+                await asyncio.sleep(_retry_delay(error, attempt, self.base_delay, self.max_delay))
+
+    def complete(self, token_estimate=0, on_retry=None, **request):
+        """
+        Synchronous wrapper around acreate() for existing callers; safe to call from many threads at once.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.acreate(token_estimate, on_retry, **request), self._ensure_loop())
+        return future.result()
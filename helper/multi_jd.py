@@ -0,0 +1,126 @@
+import numpy as np
+from helper.skills_mapping import match_job_description
+from helper.scoring import CandidateSkillMatrix
+from helper.pipeline import run_pipeline, DEFAULT_QUEUE_SIZE
+from helper.bulk_resume_processor import DEFAULT_TIMEOUT
+from helper.concurrency import run_concurrently, DEFAULT_MAX_WORKERS
+from helper.framework_pruning import LexicalIndex
+from helper.skills_framework import as_skills_framework
+
+def match_job_descriptions(job_descriptions, framework, top_k=None, framework_index=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Matches several job descriptions to the SkillsFuture Framework concurrently, one LLM call per JD.
+
+    Args:
+        job_descriptions (dict): Job description texts keyed by requisition name.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        top_k (int, optional): Number of framework rows sent to the LLM per job description (all rows if None).
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
+        max_workers (int): Maximum number of job descriptions matched at the same time.
+
+    Returns:
+        tuple: (jd_skills, failed) where jd_skills maps each requisition to its de-duplicated matched skills,
+            in the input order, and failed maps requisitions that could not be matched to their error.
+    """
+    def match(item):
+        _, jd_text = item
+        jd_matched_skills = match_job_description(jd_text, framework, top_k=top_k, framework_index=framework_index)
+        if not jd_matched_skills:
+            raise ValueError("No framework skills matched this job description")
+        return jd_matched_skills
+
+    matched = {}
+    failed = {}
+    for (jd_name, _), jd_matched_skills, error in run_concurrently(match, job_descriptions.items(), max_workers=max_workers):
+        if error is not None:
+            failed[jd_name] = error
+        else:
+            matched[jd_name] = jd_matched_skills
+    jd_skills = {jd_name: matched[jd_name] for jd_name in job_descriptions if jd_name in matched}
+    return jd_skills, failed
+
+def score_matrix(candidate_results, jd_skills):
+    """
+    Scores every candidate against every job description, encoding the candidates only once.
+
+    Args:
+        candidate_results (dict): All candidate data, keyed by candidate.
+        jd_skills (dict): Matched skills keyed by requisition name.
+
+    Returns:
+        DataFrame: JD x candidate scores (0-100), indexed by requisition name with one column per candidate.
+    """
+    import pandas as pd  # Deferred so importing this module stays fast
+
+    matrix = CandidateSkillMatrix(candidate_results)
+    scores = matrix.score_many(list(jd_skills.values())) if candidate_results else np.zeros((len(jd_skills), 0))
+    return pd.DataFrame(scores, index=list(jd_skills), columns=matrix.candidate_names)
+
+def top_candidates_per_jd(scores, top_n=None):
+    """
+    Ranks the candidates of each job description.
+
+    Args:
+        scores (DataFrame): JD x candidate score matrix from score_matrix.
+        top_n (int, optional): Number of candidates kept per job description (all if None).
+
+    Returns:
+        dict: Lists of (candidate, score) pairs in descending score order, keyed by requisition name.
+    """
+    ranked = {}
+    for jd_name, jd_scores in scores.iterrows():
+        jd_scores = jd_scores.sort_values(ascending=False, kind="stable")
+        if top_n is not None:
+            jd_scores = jd_scores.head(top_n)
+        ranked[jd_name] = list(jd_scores.items())
+    return ranked
+
+def run_multi_jd_matching(job_descriptions, resume_files, framework, llm_workers=DEFAULT_MAX_WORKERS, extraction_workers=None,
+                          queue_size=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_TIMEOUT, top_k=None, framework_index=None,
+                          pack_token_budget=None, candidate_store=None):
+    """
+    Matches many job descriptions against the same applicant pool. Each resume is extracted (and matched to the
+    framework by the LLM) exactly once; the extracted skills are then scored against every job description.
+
+    Args:
+        job_descriptions (dict): Job description texts keyed by requisition name.
+        resume_files (iterable): Resume files (uploaded files or open file objects), consumed lazily.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        llm_workers (int): Number of concurrent LLM calls.
+        extraction_workers (int, optional): Number of text extraction processes (defaults to the CPU count).
+        queue_size (int): Maximum number of items buffered between pipeline stages.
+        timeout (float, optional): Per-request timeout in seconds for each resume LLM call.
+        top_k (int, optional): Number of framework rows sent to the LLM per prompt (all rows if None).
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index; a lexical index is built once if omitted.
+        pack_token_budget (int, optional): Packs short resumes into shared requests (see run_pipeline).
+        candidate_store (CandidateStore, optional): Store of previously extracted candidate profiles.
+
+    Returns:
+        dict: "jd_skills" (matched skills per requisition), "candidates" (candidate data keyed by resume file name),
+            "scores" (JD x candidate DataFrame) and "failed" (errors keyed by requisition or resume file name).
+    """
+    framework = as_skills_framework(framework)
+    if top_k is not None and framework_index is None:
+        framework_index = LexicalIndex(framework)
+
+    jd_skills, failed = match_job_descriptions(job_descriptions, framework, top_k, framework_index, llm_workers)
+
+    # Resumes are keyed by file name, since different candidates can share a name
+    candidate_results = {}
+    processed = run_pipeline(
+        resume_files, framework, llm_workers=llm_workers, extraction_workers=extraction_workers, queue_size=queue_size,
+        timeout=timeout, top_k=top_k, framework_index=framework_index, pack_token_budget=pack_token_budget,
+        candidate_store=candidate_store,
+    )
+    for resume_file, candidate_info, _, error in processed:
+        if error is not None:
+            failed[resume_file.name] = error
+        else:
+            candidate_results[resume_file.name] = candidate_info
+
+    return {
+        "jd_skills": jd_skills,
+        "candidates": candidate_results,
+        "scores": score_matrix(candidate_results, jd_skills),
+        "failed": failed,
+    }
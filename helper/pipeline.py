@@ -0,0 +1,210 @@
+import queue
+import threading
+import contextvars
+from helper.bulk_resume_processor import match_candidate_skills, match_resume_batch, matching_prompt_version, DEFAULT_TIMEOUT, MAX_RESUMES_PER_PACK
+from helper.cache import content_hash, read_file_bytes
+from helper.concurrency import DEFAULT_MAX_WORKERS
+from helper.framework_pruning import LexicalIndex
+from helper.skills_framework import as_skills_framework
+from helper.text_extraction import ExtractionPool
+from helper.scoring import score_candidate
+
+# Maximum number of items waiting between two stages; bounds memory regardless of batch size
+DEFAULT_QUEUE_SIZE = 32
+
+_DONE = object()  # Sentinel marking the end of a stage's output
+
+def _put(stage_queue, item, stop_event):
+    # Blocks while the downstream stage is full (back-pressure), but gives up if the run was stopped
+    while not stop_event.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _start_thread(target, *args):
+    # Threads run in a copy of the caller's context so instrumentation stages and metrics carry over
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target, *args), daemon=True)
+    thread.start()
+    return thread
+
+def run_pipeline(resume_files, framework, jd_matched_skills=None, llm_workers=DEFAULT_MAX_WORKERS, extraction_workers=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_TIMEOUT, top_k=None, framework_index=None, pack_token_budget=None,
+                 candidate_store=None):
+    """
+    Runs resume extraction, LLM skill matching and scoring as separate stages connected by bounded queues.
+    Extraction uses a process pool (CPU-bound parsing) while matching uses a pool of threads (network-bound
+    LLM calls), so parsing overlaps with LLM latency. Each queue holds at most queue_size items and files
+    are only read when they enter the pipeline, so memory stays flat on very large batches.
+    Works the same from the Streamlit app and from headless batch jobs.
+
+    Args:
+        resume_files (iterable): Resume files (uploaded files or open file objects), consumed lazily.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        jd_matched_skills (list, optional): Job description matched skills; candidates are not scored if omitted.
+        llm_workers (int): Number of concurrent LLM skill matching calls.
+        extraction_workers (int, optional): Number of text extraction processes (defaults to the CPU count).
+        queue_size (int): Maximum number of items buffered between stages.
+        timeout (float, optional): Per-request timeout in seconds for each LLM call.
+        top_k (int, optional): Number of framework rows sent to the LLM per resume (all rows if None).
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index; a lexical index is built once if omitted.
+        pack_token_budget (int, optional): If set, each matching worker packs the short resumes waiting in its queue
+            into shared LLM requests of up to this many resume tokens (see match_resume_batch).
+        candidate_store (CandidateStore, optional): Store of extracted profiles. Resumes already extracted with this
+            framework and prompt skip extraction and the LLM and are only rescored; new profiles are added to it.
+
+    Yields:
+        tuple: (resume_file, candidate_info, score, error) in completion order; candidate_info and score are None if error is set.
+    """
+    framework = as_skills_framework(framework)
+    if top_k is not None and framework_index is None:
+        framework_index = LexicalIndex(framework)
+    llm_workers = max(1, int(llm_workers))
+
+    extracted_queue = queue.Queue(maxsize=queue_size)
+    matched_queue = queue.Queue(maxsize=queue_size)
+    output_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    extraction_pool = ExtractionPool(extraction_workers)
+    prompt_version = matching_prompt_version(top_k, framework_index)
+
+    def remember(file_hash, candidate_info):
+        # A store failure only costs a re-extraction next time, so it never fails the resume
+        if candidate_store is not None and file_hash is not None:
+            try:
+                candidate_store.set(file_hash, framework.content_key, prompt_version, candidate_info)
+            except Exception as error:
+                print("Could not store candidate profile:", error)
+
+    def extraction_stage():
+        # Submits files to the process pool; blocks once queue_size extractions are waiting for an LLM worker
+        try:
+            for resume_file in resume_files:
+                file_hash = None
+                try:
+                    if candidate_store is not None:
+                        file_hash = content_hash(read_file_bytes(resume_file))
+                        candidate_info = candidate_store.get(file_hash, framework.content_key, prompt_version)
+                        if candidate_info is not None:
+                            # Already extracted with this framework and prompt: go straight to scoring
+                            if not _put(matched_queue, (resume_file, candidate_info, None), stop_event):
+                                return
+                            continue
+                    job = (resume_file, file_hash, extraction_pool.submit(resume_file), None)
+                except Exception as error:
+                    job = (resume_file, file_hash, None, error)
+                if not _put(extracted_queue, job, stop_event):
+                    return
+        finally:
+            for _ in range(llm_workers):
+                _put(extracted_queue, _DONE, stop_event)
+
+    def matching_stage():
+        try:
+            while not stop_event.is_set():
+                job = extracted_queue.get()
+                if job is _DONE:
+                    return
+                if pack_token_budget:
+                    if not match_packed_jobs(job):
+                        return
+                    continue
+                resume_file, file_hash, extraction, error = job
+                candidate_info = None
+                if error is None:
+                    try:
+                        candidate_info = match_candidate_skills(extraction.result(), framework, timeout=timeout,
+                                                                top_k=top_k, framework_index=framework_index)
+                        remember(file_hash, candidate_info)
+                    except Exception as match_error:
+                        error = match_error
+                if not _put(matched_queue, (resume_file, candidate_info, error), stop_event):
+                    return
+        finally:
+            _put(matched_queue, _DONE, stop_event)
+
+    def match_packed_jobs(job):
+        # Takes the first job plus whatever else is already waiting (without blocking), so packing never delays a
+        # lone resume. Returns False when the worker should stop.
+        jobs = [job]
+        finished = False
+        while len(jobs) < MAX_RESUMES_PER_PACK * 2:  # Some slack so the bin packing can choose between resumes
+            try:
+                next_job = extracted_queue.get_nowait()
+            except queue.Empty:
+                break
+            if next_job is _DONE:
+                finished = True
+                break
+            jobs.append(next_job)
+
+        results = []
+        texts = []
+        for resume_file, file_hash, extraction, error in jobs:
+            if error is None:
+                try:
+                    texts.append((len(results), file_hash, extraction.result()))
+                except Exception as extraction_error:
+                    error = extraction_error
+            results.append([resume_file, None, error])
+
+        if texts:
+            matches = match_resume_batch([text for _, _, text in texts], framework, timeout=timeout, top_k=top_k,
+                                         framework_index=framework_index, token_budget=pack_token_budget)
+            for (position, file_hash, _), (candidate_info, error) in zip(texts, matches):
+                results[position][1:] = [candidate_info, error]
+                if error is None:
+                    remember(file_hash, candidate_info)
+
+        for result in results:
+            if not _put(matched_queue, tuple(result), stop_event):
+                return False
+        return not finished
+
+    def scoring_stage():
+        finished_workers = 0
+        while finished_workers < llm_workers and not stop_event.is_set():
+            job = matched_queue.get()
+            if job is _DONE:
+                finished_workers += 1
+                continue
+            resume_file, candidate_info, error = job
+            score = None
+            if error is None and jd_matched_skills is not None:
+                try:
+                    score = score_candidate(candidate_info, jd_matched_skills)
+                except Exception as scoring_error:
+                    candidate_info, error = None, scoring_error
+            if not _put(output_queue, (resume_file, candidate_info, score, error), stop_event):
+                return
+        _put(output_queue, _DONE, stop_event)
+
+    threads = [_start_thread(extraction_stage), _start_thread(scoring_stage)]
+    threads.extend(_start_thread(matching_stage) for _ in range(llm_workers))
+
+    try:
+        while True:
+            result = output_queue.get()
+            if result is _DONE:
+                break
+            yield result
+    finally:
+        # Also reached when the caller stops iterating early: unblock every stage and release the pool
+        stop_event.set()
+        for stage_queue in (extracted_queue, matched_queue, output_queue):
+            try:
+                while True:
+                    stage_queue.get_nowait()
+            except queue.Empty:
+                pass
+        for stage_queue in (extracted_queue, matched_queue):
+            for _ in range(llm_workers):
+                try:
+                    stage_queue.put_nowait(_DONE)
+                except queue.Full:
+                    break
+        for thread in threads:
+            thread.join(timeout=timeout)
+        extraction_pool.shutdown()
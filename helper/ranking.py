@@ -0,0 +1,46 @@
+import heapq
+import itertools
+
+class LiveRanking:
+    """
+    Maintains the top-N candidates by score as scores stream in, using a bounded min-heap
+    so each new result costs O(log N) instead of re-sorting every candidate.
+    """
+
+    def __init__(self, top_n):
+        self.top_n = max(1, int(top_n))
+        self.scores = {}
+        self._heap = []  # (score, -arrival order, candidate name); the weakest leader sits at the root
+        self._arrival = itertools.count()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def push(self, candidate_name, score):
+        """
+        Adds (or replaces) a candidate's score.
+
+        Args:
+            candidate_name (str): The candidate's name.
+            score (float): The candidate's normalised score.
+        """
+        replacing = candidate_name in self.scores
+        self.scores[candidate_name] = score
+
+        if replacing:
+            # A candidate was re-scored (e.g. duplicate name); rebuild the leaders from all known scores
+            self._heap = [(s, -next(self._arrival), name) for name, s in heapq.nlargest(self.top_n, self.scores.items(), key=lambda item: item[1])]
+            heapq.heapify(self._heap)
+            return
+
+        entry = (score, -next(self._arrival), candidate_name)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def top(self):
+        """
+        Returns the current leaders as (candidate name, score) pairs, best first.
+        """
+        return [(name, score) for score, _, name in sorted(self._heap, reverse=True)]
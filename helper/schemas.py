@@ -0,0 +1,74 @@
+from typing import List, Optional, Union
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Output schemas for every LLM stage. Field aliases keep the keys the rest of the app already uses
+# (e.g. "Proficiency Level"), so validated objects dump back to the same dictionaries.
+
+class LLMOutput(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+class CandidateSkill(LLMOutput):
+    skill: str = Field(alias="Skill")
+    category: str = Field("N/A", alias="Category")
+    proficiency_level: str = Field("N/A", alias="Proficiency Level")
+    explanation: str = Field("", alias="Explanation")
+
+class CandidateProfile(LLMOutput):
+    name: str = Field(alias="Name")
+    qualification: Union[str, List[str]] = Field("N/A", alias="Qualification")
+    skills: List[CandidateSkill] = Field(default_factory=list, alias="Skills")
+
+    @field_validator("qualification")
+    @classmethod
+    def join_qualifications(cls, value):
+        # Models often list several qualifications; the app shows them as one string
+        return "; ".join(value) if isinstance(value, list) else value
+
+class PackedCandidateProfile(CandidateProfile):
+    # The prompt tags resumes as <resume id="1">, so models often echo the id as a number
+    resume_id: Union[int, str] = Field(alias="Resume ID")
+
+class CandidateProfileBatch(LLMOutput):
+    candidates: List[PackedCandidateProfile] = Field(alias="Candidates")
+
+class JDSkill(LLMOutput):
+    job_responsibility: str = Field("", alias="Job Responsibility")
+    skill: str = Field(alias="Skill")
+    proficiency_level: str = Field("N/A", alias="Proficiency Level")
+    explanation: str = Field("", alias="Explanation")
+    importance: int = Field(3, ge=1, le=5, alias="Importance")
+
+class JDSkillMatches(LLMOutput):
+    skills: List[JDSkill] = Field(alias="Skills")
+
+class ParsedJobDescription(LLMOutput):
+    job_title: Optional[str] = Field(None, alias="Job Title")
+    responsibilities: List[str] = Field(default_factory=list, alias="Responsibilities")
+    qualifications: List[str] = Field(default_factory=list, alias="Qualifications")
+    skills: List[str] = Field(default_factory=list, alias="Skills")
+
+class AssessmentItem(LLMOutput):
+    question: str
+    answer: str
+    skill: str
+
+class Assessment(LLMOutput):
+    questions: List[AssessmentItem]
+
+def decode_json(text):
+    """
+    Decodes a JSON response with orjson, tolerating a surrounding ```json code fence.
+    """
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.startswith("json"):
+            text = text[len("json"):]
+    return orjson.loads(text)
+
+def to_output_dict(validated):
+    """
+    Dumps a validated schema object back to plain dictionaries with the app's original keys.
+    """
+    return validated.model_dump(by_alias=True)
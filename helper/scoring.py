@@ -1,5 +1,8 @@
 import json
+import numpy as np
 from helper.llm import get_completion
+from helper.instrumentation import stage
+from helper.skills_framework import proficiency_rank, PROFICIENCY_LEVELS
 
 def load_json_data(jd_skills_str, candidate_results_str):
     """
@@ -16,17 +19,46 @@ def load_json_data(jd_skills_str, candidate_results_str):
     candidate_results = json.loads(candidate_results_str)
     return jd_skills, candidate_results
 
-def evaluate_skill_relevance(candidate_skill, jd_skill):
+relevance_mapping = {
+    "Full Match": 1.0,
+    "Partial Match": 0.5,
+    "No Match": 0.0
+}
+
+# Weights for each scoring category
+RELEVANCE_WEIGHT = 0.6
+PROFICIENCY_WEIGHT = 0.20
+IMPORTANCE_WEIGHT = 0.20
+DEFAULT_IMPORTANCE = 3
+MAX_POINTS_PER_SKILL = 1.5  # Used to normalise scores to 0-100
+
+def is_exact_skill_match(candidate_skill_name, jd_skill_name):
+    """
+    Checks whether two skill names are the same, ignoring case and surrounding whitespace.
     """
-    Uses the LLM to evaluate the relevance of a candidate's skill to the job description skill.
+    return str(candidate_skill_name).strip().lower() == str(jd_skill_name).strip().lower()
+
+@stage("scoring")
+def evaluate_skill_relevance(candidate_skill, jd_skill, skills_index=None):
+    """
+    Evaluates the relevance of a candidate's skill to the job description skill.
+    Identical skill names are resolved locally; other pairs use the embedding index if given, otherwise an LLM call.
+    score_candidate only pairs identical names, so ranking never reaches the index or the LLM here.
     
     Args:
         candidate_skill (dict): A skill from the candidate's skillset.
         jd_skill (dict): A skill from the job description's requirements.
+        skills_index (SkillsIndex, optional): Embedding index used instead of the LLM.
         
     Returns:
         float: Relevance score (1.0 for Full Match, 0.5 for Partial Match, 0.0 for No Match).
     """
+    if is_exact_skill_match(candidate_skill['Skill'], jd_skill['Skill']):
+        return relevance_mapping["Full Match"]
+
+    if skills_index is not None:
+        return skills_index.relevance(candidate_skill['Skill'], jd_skill['Skill'])
+
     prompt = f"""
     Evaluate the relevance of the candidate's skill to the job description skill.
     
@@ -41,11 +73,6 @@ def evaluate_skill_relevance(candidate_skill, jd_skill):
     
     response = get_completion(prompt).strip()
     
-    relevance_mapping = {
-        "Full Match": 1.0,
-        "Partial Match": 0.5,
-        "No Match": 0.0
-    }
     return relevance_mapping.get(response, 0.0)
 
 def calculate_skill_score(candidate_skill, jd_skill):
@@ -62,11 +89,11 @@ def calculate_skill_score(candidate_skill, jd_skill):
         float: The weighted score for this skill match.
     """
     # Define weights for each scoring category
-    relevance_weight = 0.6
-    proficiency_weight = 0.20
-    importance_weight = 0.20
+    relevance_weight = RELEVANCE_WEIGHT
+    proficiency_weight = PROFICIENCY_WEIGHT
+    importance_weight = IMPORTANCE_WEIGHT
 
-    # Calculate relevance score using LLM
+    # Calculate relevance score (resolved locally for identical skills, LLM only as a fallback)
     relevance_points = evaluate_skill_relevance(candidate_skill, jd_skill)
     
     proficiency_points = 0
@@ -74,26 +101,21 @@ def calculate_skill_score(candidate_skill, jd_skill):
     
     # Calculate proficiency and importance points based on relevance
     if relevance_points > 0:
-        # Calculate proficiency score with your modification for higher proficiency levels
+        # Calculate proficiency score: full points at or above the required level, half points one level below
+        candidate_rank = proficiency_rank(candidate_skill["Proficiency Level"])
+        jd_rank = proficiency_rank(jd_skill["Proficiency Level"])
         if candidate_skill["Proficiency Level"] == jd_skill["Proficiency Level"]:
             proficiency_points = 1
-        elif (candidate_skill["Proficiency Level"], jd_skill["Proficiency Level"]) in [
-            ("Advanced", "Intermediate"),
-            ("Advanced", "Basic"),
-            ("Intermediate", "Basic")
-        ]:
+        elif candidate_rank and jd_rank and candidate_rank > jd_rank:
             proficiency_points = 1
-        elif (candidate_skill["Proficiency Level"], jd_skill["Proficiency Level"]) in [
-            ("Intermediate", "Advanced"), 
-            ("Basic", "Intermediate")
-        ]:
+        elif candidate_rank and jd_rank and candidate_rank == jd_rank - 1:
             proficiency_points = 0.5
 
         # Calculate importance points based on JD importance level
-        importance_points = jd_skill.get("Importance", 3) * importance_weight
+        importance_points = jd_skill.get("Importance", DEFAULT_IMPORTANCE) * importance_weight
     else:
         # Apply a penalty for non-matching skills based on importance level
-        importance_points = 0 if jd_skill.get("Importance", 3) <= 2 else 0.1
+        importance_points = 0 if jd_skill.get("Importance", DEFAULT_IMPORTANCE) <= 2 else 0.1
 
     # Calculate the total weighted score for the skill
     weighted_score = (
@@ -117,13 +139,101 @@ def score_candidate(candidate_info, jd_matched_skills):
             else:
                 print("Unexpected data structure:", jd_skill, candidate_skill)  # Debugging line
                 
-    max_possible_score = len(jd_matched_skills) * 1.5
+    max_possible_score = len(jd_matched_skills) * MAX_POINTS_PER_SKILL
     normalized_score = (total_score / max_possible_score) * 100
     return min(normalized_score, 100)
 
+class CandidateSkillMatrix:
+    """
+    Vectorised scoring engine. Candidates are encoded once as a candidates x skills matrix of proficiency codes
+    (skill names mapped to integer column IDs, proficiency levels to ordinals), so scoring against a JD, or
+    against many JDs, is a handful of NumPy array operations instead of nested Python loops.
+    Produces the same scores as score_candidate: each JD skill is paired with the candidate's first skill of
+    the same name, which is always a Full Match.
+    """
+
+    # Codes 1..3 are proficiency ranks; unrecognised levels get codes from UNKNOWN_LEVEL_CODE upwards, so two
+    # identical unrecognised levels still count as equal (as in calculate_skill_score) but are never ordered
+    UNKNOWN_LEVEL_CODE = len(PROFICIENCY_LEVELS) + 1
+
+    def __init__(self, candidate_results):
+        """
+        Args:
+            candidate_results (dict): All candidate data, keyed by candidate name.
+        """
+        self.candidate_names = list(candidate_results)
+        self.skill_ids = {}
+        self.level_codes = {level: proficiency_rank(level) for level in PROFICIENCY_LEVELS}
+
+        rows, columns, codes = [], [], []
+        for row, candidate_info in enumerate(candidate_results.values()):
+            seen = set()
+            for skill in candidate_info.get("Skills", []):
+                if not isinstance(skill, dict):
+                    continue
+                column = self.skill_ids.setdefault(skill["Skill"], len(self.skill_ids))
+                if column in seen:
+                    continue  # Only the first skill of each name is scored
+                seen.add(column)
+                rows.append(row)
+                columns.append(column)
+                codes.append(self._level_code(skill.get("Proficiency Level")))
+
+        # Code 0 means the candidate does not have the skill
+        self.proficiency = np.zeros((len(self.candidate_names), len(self.skill_ids)), dtype=np.int16)
+        self.proficiency[rows, columns] = codes
+
+    def _level_code(self, level):
+        return self.level_codes.setdefault(level, self.UNKNOWN_LEVEL_CODE + len(self.level_codes) - len(PROFICIENCY_LEVELS))
+
+    def score(self, jd_matched_skills):
+        """
+        Scores every candidate against one job description.
+
+        Args:
+            jd_matched_skills (list): Job description matched skills with importance and proficiency levels.
+
+        Returns:
+            np.ndarray: Scores normalized to a 0-100 range, in the order of candidate_names.
+        """
+        if not jd_matched_skills:
+            raise ZeroDivisionError("No job description skills to score against")  # As in score_candidate
+        # JD skills no candidate has add nothing to any score
+        jd_skills = [skill for skill in jd_matched_skills if isinstance(skill, dict) and skill["Skill"] in self.skill_ids]
+
+        columns = np.array([self.skill_ids[skill["Skill"]] for skill in jd_skills], dtype=np.intp)
+        jd_codes = np.array([self._level_code(skill.get("Proficiency Level")) for skill in jd_skills], dtype=np.int16)
+        importance = np.array([skill.get("Importance", DEFAULT_IMPORTANCE) for skill in jd_skills], dtype=np.float64)
+
+        candidate_codes = self.proficiency[:, columns]
+        has_skill = candidate_codes > 0
+        ranked = (candidate_codes < self.UNKNOWN_LEVEL_CODE) & (jd_codes < self.UNKNOWN_LEVEL_CODE)
+
+        # Full proficiency points at or above the required level, half points one level below
+        proficiency_points = np.where(
+            (candidate_codes == jd_codes) | (ranked & (candidate_codes > jd_codes)), 1.0,
+            np.where(ranked & (candidate_codes == jd_codes - 1), 0.5, 0.0),
+        )
+        skill_points = relevance_mapping["Full Match"] * RELEVANCE_WEIGHT + proficiency_points * PROFICIENCY_WEIGHT + importance * IMPORTANCE_WEIGHT
+        total_scores = np.where(has_skill, skill_points, 0.0).sum(axis=1)
+
+        max_possible_score = len(jd_matched_skills) * MAX_POINTS_PER_SKILL
+        return np.minimum(total_scores / max_possible_score * 100, 100)
+
+    def score_many(self, jd_skill_lists):
+        """
+        Scores every candidate against several job descriptions.
+
+        Returns:
+            np.ndarray: A JDs x candidates score matrix.
+        """
+        return np.vstack([self.score(jd_matched_skills) for jd_matched_skills in jd_skill_lists]) if jd_skill_lists else np.zeros((0, len(self.candidate_names)))
+
 def score_all_candidates(candidate_results, jd_matched_skills):
     """
     Scores all candidates and returns a dictionary with candidate names and their scores.
+    Skills are paired by name, so relevance is resolved locally and scoring makes no per-pair LLM calls.
+    All candidates are scored at once with the vectorised CandidateSkillMatrix.
     
     Args:
         candidate_results (dict): All candidate data.
@@ -132,7 +242,5 @@ def score_all_candidates(candidate_results, jd_matched_skills):
     Returns:
         dict: Scores for each candidate, normalized to a 0-100 range.
     """
-    candidate_scores = {}
-    for candidate_name, candidate_info in candidate_results.items():
-        candidate_scores[candidate_name] = score_candidate(candidate_info, jd_matched_skills)
-    return candidate_scores
+    scores = CandidateSkillMatrix(candidate_results).score(jd_matched_skills)
+    return dict(zip(candidate_results, scores.tolist()))
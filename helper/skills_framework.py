@@ -0,0 +1,99 @@
+import sys
+from functools import cached_property
+import math
+import numpy as np
+from helper.cache import content_hash
+
+# Proficiency levels in increasing order; their position is the proficiency rank used for comparisons
+PROFICIENCY_LEVELS = ("Basic", "Intermediate", "Advanced")
+PROFICIENCY_ORDER = {level: rank for rank, level in enumerate(PROFICIENCY_LEVELS, start=1)}
+
+FRAMEWORK_COLUMNS = ("Skill", "Category", "Proficiency Level", "Description")
+
+def proficiency_rank(level):
+    """
+    Returns the rank of a proficiency level (1 = Basic ... 3 = Advanced), or 0 if it is not recognised.
+    """
+    return PROFICIENCY_ORDER.get(level, 0)
+
+def _clean(value):
+    # Tabs and newlines would break the one-row-per-line prompt table
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return " ".join(str(value).split())
+
+class SkillsFramework:
+    """
+    Compact, precomputed representation of the SkillsFuture Framework, built once per uploaded file.
+    Holds interned skill names, proficiency levels and category codes as columns and a compact
+    tab-separated serialisation for prompts. Pruned subsets slice these columns instead of re-parsing rows.
+    """
+
+    def __init__(self, framework_df):
+        self.df = framework_df.reset_index(drop=True)
+        records = self.df.to_dict(orient="records")
+
+        self.skills = [sys.intern(_clean(row.get("Skill"))) for row in records]
+        self.descriptions = [_clean(row.get("Description")) for row in records]
+        self.proficiency_levels = [sys.intern(_clean(row.get("Proficiency Level"))) for row in records]
+
+        category_codes = {}
+        for row in records:
+            category_codes.setdefault(sys.intern(_clean(row.get("Category"))), len(category_codes))
+        self.categories = list(category_codes)
+        self.category_codes = np.array([category_codes[_clean(row.get("Category"))] for row in records], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.skills)
+
+    def category(self, row):
+        """
+        Returns the category name of a framework row.
+        """
+        return self.categories[self.category_codes[row]]
+
+    @cached_property
+    def content_key(self):
+        """
+        Content hash of the framework, e.g. for keying stored extraction results.
+        """
+        return content_hash(self.prompt_text)
+
+    @cached_property
+    def prompt_text(self):
+        """
+        Tab-separated serialisation of the framework for prompts (far fewer tokens than a list of dicts).
+        """
+        lines = ["\t".join(FRAMEWORK_COLUMNS)]
+        lines.extend(
+            "\t".join((self.skills[row], self.category(row), self.proficiency_levels[row], self.descriptions[row]))
+            for row in range(len(self))
+        )
+        return "\n".join(lines)
+
+    def subset(self, rows):
+        """
+        Returns a new SkillsFramework containing only the given row positions (e.g. after pruning).
+        """
+        rows = list(rows)
+        subset = SkillsFramework.__new__(SkillsFramework)
+        subset.df = self.df.iloc[rows].reset_index(drop=True)
+        subset.skills = [self.skills[row] for row in rows]
+        subset.descriptions = [self.descriptions[row] for row in rows]
+        subset.proficiency_levels = [self.proficiency_levels[row] for row in rows]
+        # Keeps the full category list; only the codes of the selected rows are copied
+        subset.categories = self.categories
+        subset.category_codes = self.category_codes[rows]
+        return subset
+
+def as_skills_framework(framework):
+    """
+    Returns the framework as a SkillsFramework, building one if a DataFrame is passed.
+    """
+    return framework if isinstance(framework, SkillsFramework) else SkillsFramework(framework)
+
+def framework_dataframe(framework):
+    """
+    Returns the underlying DataFrame of a SkillsFramework, or the DataFrame itself.
+    """
+    return framework.df if isinstance(framework, SkillsFramework) else framework
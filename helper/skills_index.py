@@ -0,0 +1,189 @@
+import os
+import hashlib
+import numpy as np
+from helper.cache import CACHE_DIR, content_hash
+from helper.skills_framework import framework_dataframe
+
+# On-disk location of the embedded framework matrices (one .npy file per framework and backend)
+INDEX_DIR = os.path.join(CACHE_DIR, "skills_index")
+
+# Cosine similarity thresholds used to map embeddings onto the LLM relevance labels
+FULL_MATCH_THRESHOLD = 0.85
+PARTIAL_MATCH_THRESHOLD = 0.6
+
+STUB_EMBEDDING_DIM = 256
+EMBEDDING_BATCH_SIZE = 256
+
+def stub_embedding(texts, dim=STUB_EMBEDDING_DIM):
+    """
+    Deterministic, offline embedding backend based on hashed words and character trigrams.
+    Useful for tests and for running without an API key; similar strings get similar vectors.
+
+    Args:
+        texts (list): Texts to embed.
+        dim (int): Size of each embedding vector.
+
+    Returns:
+        list: One embedding (list of floats) per text.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        normalized = " ".join(str(text).lower().split())
+        features = normalized.split() + [normalized[i:i + 3] for i in range(max(len(normalized) - 2, 0))]
+        for feature in features:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            vectors[row, int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] % 2 else -1.0
+    return vectors.tolist()
+
+def openai_embedding(texts):
+    """
+    Embedding backend using the OpenAI embeddings endpoint from helper.llm.
+    """
+    from helper.llm import get_embedding  # Imported here so the stub backend works without API credentials
+    return get_embedding(texts)
+
+EMBEDDING_BACKENDS = {
+    "openai": openai_embedding,
+    "stub": stub_embedding,
+}
+
+def framework_row_text(row):
+    """
+    Builds the text embedded for a single framework row.
+    """
+    return f"{row['Skill']} ({row['Category']}, {row['Proficiency Level']}): {row['Description']}"
+
+def framework_hash(framework_df):
+    """
+    Returns a content hash identifying a SkillsFuture Framework DataFrame.
+    """
+    return content_hash(framework_df.to_csv(index=False))
+
+def _embed(texts, embed_fn, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Embeds texts in batches and returns an L2-normalised float32 matrix.
+    """
+    batches = [np.asarray(embed_fn(texts[start:start + batch_size]), dtype=np.float32)
+               for start in range(0, len(texts), batch_size)]
+    matrix = np.vstack(batches) if batches else np.zeros((0, STUB_EMBEDDING_DIM), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+class SkillsIndex:
+    """
+    Vector index over the rows of the SkillsFuture Framework for cosine top-k lookups and
+    embedding-based skill relevance, built once per framework and embedding backend.
+    In the ranking pipeline it is used for framework pruning (pass it as framework_index, or use
+    batch_score.py --embedding-backend). Scoring pairs skills by identical name, which is always a
+    Full Match, so relevance() only matters when evaluate_skill_relevance is called on different names.
+    """
+
+    def __init__(self, framework_df, matrix, backend="openai"):
+        self.framework_df = framework_df.reset_index(drop=True)
+        self.matrix = matrix
+        self.backend = backend
+        self.embed_fn = EMBEDDING_BACKENDS[backend]
+        self._name_vectors = {}
+
+    @classmethod
+    def build(cls, framework, backend="openai", index_dir=INDEX_DIR, framework_key=None):
+        """
+        Embeds every framework row (batched) or memory-maps a previously saved matrix for the same framework.
+
+        Args:
+            framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+            backend (str): Name of the embedding backend in EMBEDDING_BACKENDS ("openai" or "stub").
+            index_dir (str): Directory where embedding matrices are stored.
+            framework_key (str, optional): Hash of the framework file; computed from the DataFrame if omitted.
+
+        Returns:
+            SkillsIndex: The index for this framework.
+        """
+        framework_df = framework_dataframe(framework)
+        framework_key = framework_key or framework_hash(framework_df)
+        path = os.path.join(index_dir, f"{content_hash([framework_key, backend])}.npy")
+
+        if not os.path.exists(path):
+            texts = [framework_row_text(row) for row in framework_df.to_dict(orient="records")]
+            matrix = _embed(texts, EMBEDDING_BACKENDS[backend])
+            os.makedirs(index_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(temp_path, matrix)
+            os.replace(temp_path, path)  # Atomic so concurrent sessions never read a partial file
+
+        return cls(framework_df, np.load(path, mmap_mode="r"), backend)
+
+    def embed(self, texts):
+        """
+        Returns L2-normalised embeddings for arbitrary query texts.
+        """
+        return _embed(list(texts), self.embed_fn)
+
+    def _embed_names(self, names):
+        # Skill names repeat across candidates, so their vectors are memoised per index
+        missing = [name for name in dict.fromkeys(names) if name not in self._name_vectors]
+        if missing:
+            for name, vector in zip(missing, self.embed(missing)):
+                self._name_vectors[name] = vector
+        return np.vstack([self._name_vectors[name] for name in names])
+
+    def top_k(self, query_texts, k=5):
+        """
+        Finds the k most similar framework rows for each query text.
+
+        Args:
+            query_texts (list): Texts to look up.
+            k (int): Number of rows to return per query.
+
+        Returns:
+            tuple: (indices, scores) arrays of shape (len(query_texts), k), best match first.
+        """
+        k = min(k, len(self.framework_df))
+        scores = self.embed(query_texts) @ np.asarray(self.matrix).T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def shortlist(self, text, k=20):
+        """
+        Returns the k framework rows most relevant to a resume or job description text.
+        """
+        indices, _ = self.top_k([text], k)
+        return self.framework_df.iloc[indices[0]]
+
+    def similarity(self, candidate_skill_names, jd_skill_names):
+        """
+        Returns the cosine similarity of each (candidate skill, JD skill) name pair.
+        """
+        if not candidate_skill_names:
+            return np.zeros(0, dtype=np.float32)
+        return np.einsum("ij,ij->i", self._embed_names(candidate_skill_names), self._embed_names(jd_skill_names))
+
+    def relevance_table(self, skill_pairs):
+        """
+        Maps (candidate skill name, JD skill name) pairs to relevance scores using the similarity thresholds.
+
+        Args:
+            skill_pairs (iterable): Pairs of (candidate skill name, JD skill name).
+
+        Returns:
+            dict: Relevance scores (1.0, 0.5 or 0.0) keyed by pair.
+        """
+        skill_pairs = list(dict.fromkeys(skill_pairs))
+        if not skill_pairs:
+            return {}
+        candidate_names, jd_names = zip(*skill_pairs)
+        similarity = self.similarity(list(candidate_names), list(jd_names))
+        scores = np.select(
+            [similarity >= FULL_MATCH_THRESHOLD, similarity >= PARTIAL_MATCH_THRESHOLD],
+            [1.0, 0.5],
+            default=0.0,
+        )
+        return dict(zip(skill_pairs, scores.tolist()))
+
+    def relevance(self, candidate_skill_name, jd_skill_name):
+        """
+        Returns the relevance score (1.0, 0.5 or 0.0) of a single pair of skill names.
+        """
+        return self.relevance_table([(candidate_skill_name, jd_skill_name)])[(candidate_skill_name, jd_skill_name)]
@@ -1,12 +1,54 @@
-import pandas as pd
-from helper.llm import get_completion
-import json
+import os
+import io
+import copy
+import threading
+from collections import OrderedDict
+from helper.llm import get_structured_completion
+from helper.instrumentation import stage
+from helper.cache import CACHE_DIR, content_hash, read_file_bytes
+from helper.framework_pruning import prune_framework
+from helper.skills_framework import as_skills_framework, proficiency_rank
 
-def load_skills_future_framework(file_path):
+# Parsed frameworks are stored as Parquet, keyed by the hash of the uploaded .xlsx file
+FRAMEWORK_CACHE_DIR = os.path.join(CACHE_DIR, "frameworks")
+
+# De-duplicated JD matches, keyed by (JD content hash, framework hash, top_k); the most recent entries are kept
+JD_MATCH_CACHE_SIZE = 128
+_jd_match_cache = OrderedDict()
+_jd_match_cache_lock = threading.Lock()
+
+def framework_file_hash(file_path):
+    """
+    Returns the content hash of a SkillsFuture Framework file (path or uploaded file).
+    """
+    return content_hash(read_file_bytes(file_path))
+
+def load_skills_future_framework(file_path, cache_dir=FRAMEWORK_CACHE_DIR):
     """
     Loads the SkillsFuture Framework from an Excel file and returns a DataFrame.
+    The parsed table is cached on disk as Parquet keyed by the file's content hash, so the
+    slow Excel parse only happens the first time a given framework file is seen.
     """
-    framework_df = pd.read_excel(file_path)
+    import pandas as pd  # Deferred so importing this module stays fast
+
+    file_bytes = read_file_bytes(file_path)
+    cache_path = os.path.join(cache_dir, f"{content_hash(file_bytes)}.parquet")
+
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as error:
+            print("Ignoring unreadable framework cache:", error)  # Fall back to parsing the Excel file
+
+    framework_df = pd.read_excel(io.BytesIO(file_bytes))
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        framework_df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, cache_path)  # Atomic so concurrent sessions never read a partial file
+    except Exception as error:
+        print("Could not cache framework as Parquet:", error)
     
     return framework_df 
 
@@ -31,30 +73,29 @@ def load_skills_future_framework(file_path):
     
 #     return keywords
 
-def llm_assisted_skill_matching(job_description, framework_df):
+@stage("jd_matching")
+def llm_assisted_skill_matching(job_description, framework, top_k=None, framework_index=None):
     """
     Uses the LLM to match job description responsibilities to relevant skills in the SkillsFuture Framework,
     including a ranking of importance.
     
     Args:
         job_description (str): The full text of the job description.
-        framework_df (DataFrame): The SkillsFuture Framework DataFrame.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        top_k (int, optional): If set, only the top_k framework rows most relevant to the job description are sent to the LLM.
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
         
     Returns:
-        str: The LLM's structured output with matched skills and importance ranking.
+        list: The matched skills, each with its responsibility, proficiency level, explanation and importance ranking.
     """
-    # Convert the skills framework into a format the LLM can read, e.g., JSON-like structure or text table
-    framework_text = framework_df.to_dict(orient="records")
+    # Keep only the relevant part of the framework and use its compact tab-separated form
+    framework = prune_framework(job_description, as_skills_framework(framework), top_k, framework_index)
+    framework_text = framework.prompt_text
     
-    # Craft the prompt for the LLM
-    prompt = f"""
-    Given the following job description, map each key responsibility and skill to the most relevant skills in the SkillsFuture Framework.
-
-    Job Description:
-    {job_description}
-
-    SkillsFuture Framework:
-    {framework_text}
+    # Craft the prompt for the LLM. The instructions and framework form a fixed system message and the job description
+    # comes last, so repeated runs against the same framework share a prefix the provider can cache.
+    system_prompt = f"""
+    Given a job description, map each key responsibility and skill to the most relevant skills in the SkillsFuture Framework.
 
     For each responsibility and skill mentioned in the job description, provide only one relevant skill from the SkillsFuture Framework, along with the proficiency level required. Explain why it matches and rank its importance for this job on a scale of 1 to 5, with 1 being critical to the role and 5 being least important.
 
@@ -62,30 +103,40 @@ def llm_assisted_skill_matching(job_description, framework_df):
     - Each skill in the final output must be unique. Do not repeat any skills that have already been mapped.
     - If multiple relevant skills are identified for a responsibility, include only the single most relevant one.
     - If there are differing proficiency levels for relevant skills, choose the one with the highest proficiency level and omit others.
-    - The output should be in strict JSON format.
+    - The output should be a single JSON object with a "Skills" list.
 
-    Please output each entry in the following format:
+    Please output the result in the following format:
     {{
-        "Job Responsibility": "Identify relevant data sources and perform data collection...",
-        "Skill": "Web Development",
-        "Proficiency Level": "Intermediate",
-        "Explanation": "Web scraping often involves using web development techniques...",
-        "Importance": 4
-    }},
-    {{
-        "Job Responsibility": "Process data, which includes cleaning and organising datasets...",
-        "Skill": "SQL Database Management",
-        "Proficiency Level": "Advanced",
-        "Explanation": "This responsibility involves managing and structuring data...",
-        "Importance": 5
+      "Skills": [
+        {{
+            "Job Responsibility": "Identify relevant data sources and perform data collection...",
+            "Skill": "Web Development",
+            "Proficiency Level": "Intermediate",
+            "Explanation": "Web scraping often involves using web development techniques...",
+            "Importance": 4
+        }},
+        {{
+            "Job Responsibility": "Process data, which includes cleaning and organising datasets...",
+            "Skill": "SQL Database Management",
+            "Proficiency Level": "Advanced",
+            "Explanation": "This responsibility involves managing and structuring data...",
+            "Importance": 5
+        }}
+      ]
     }}
-    """
 
-    response = get_completion(prompt)
+    SkillsFuture Framework (tab-separated, one skill and proficiency level per line):
+    {framework_text}
+    """
+    prompt = f"""
+    Job Description:
+    {job_description}
+    """
 
-    response = response.strip("```json").strip("```").strip()
+    from helper.schemas import JDSkillMatches  # Deferred so importing this module stays fast
+    response = get_structured_completion(prompt, JDSkillMatches, system_prompt=system_prompt)
     
-    return response
+    return response["Skills"]
 
 # Prompt Chaining
 
@@ -174,6 +225,37 @@ def llm_assisted_skill_matching(job_description, framework_df):
     
 #     return final_output_no_dup
 
+def match_job_description(job_description, framework, top_k=None, framework_index=None):
+    """
+    Single-pass JD processing: matches the job description to the framework with one LLM call and removes
+    duplicate skills. Results are cached per JD content hash (with the framework, top_k and index), so rescoring or
+    recomputing with the same JD costs no LLM round-trip.
+
+    Args:
+        job_description (str): The full text of the job description.
+        framework (SkillsFramework or DataFrame): The SkillsFuture Framework.
+        top_k (int, optional): If set, only the top_k framework rows most relevant to the job description are sent to the LLM.
+        framework_index (LexicalIndex or SkillsIndex, optional): Prebuilt index used to select those rows.
+
+    Returns:
+        list: The unique matched skills for the job description.
+    """
+    framework = as_skills_framework(framework)
+    # An embedding index (which has a backend) shortlists different framework rows than the lexical one
+    cache_key = (content_hash(job_description), framework.content_key, top_k, getattr(framework_index, "backend", None))
+    with _jd_match_cache_lock:
+        if cache_key in _jd_match_cache:
+            _jd_match_cache.move_to_end(cache_key)
+            return copy.deepcopy(_jd_match_cache[cache_key])
+
+    jd_matched_skills = remove_duplicate_skills(llm_assisted_skill_matching(job_description, framework, top_k, framework_index))
+
+    with _jd_match_cache_lock:
+        _jd_match_cache[cache_key] = copy.deepcopy(jd_matched_skills)
+        while len(_jd_match_cache) > JD_MATCH_CACHE_SIZE:
+            _jd_match_cache.popitem(last=False)
+    return jd_matched_skills
+
 def remove_duplicate_skills(jd_matched_skills):
     """
     Removes duplicate skills from the job description matched skills.
@@ -199,9 +281,7 @@ def remove_duplicate_skills(jd_matched_skills):
             current_proficiency = skill.get("Proficiency Level", "N/A")
             existing_proficiency = unique_skills[skill_name].get("Proficiency Level", "N/A")
             
-            # Define a simple proficiency hierarchy for comparison, if necessary
-            proficiency_order = {"Basic": 1, "Intermediate": 2, "Advanced": 3}
-            if proficiency_order.get(current_proficiency, 0) > proficiency_order.get(existing_proficiency, 0):
+            if proficiency_rank(current_proficiency) > proficiency_rank(existing_proficiency):
                 unique_skills[skill_name] = skill
 
     return list(unique_skills.values())
\ No newline at end of file
@@ -1,18 +1,22 @@
-import streamlit as st
-import pandas as pd
+from functools import lru_cache
 from helper.file_handler import parse_job_description
-from langchain.chains import SequentialChain, LLMChain
-from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
+from helper.llm import get_api_key
 import json
 
-# Initialize the LangChain LLM
-llm = OpenAI(api_key=st.secrets["PERSONAL_OPENAI_API_KEY"])
+# LangChain, the LLM and the chains are only built on first use, so importing this module is cheap
+@lru_cache(maxsize=None)
+def get_llm():
+    """
+    Initializes the LangChain LLM.
+    """
+    from langchain.llms import OpenAI
+    return OpenAI(api_key=get_api_key())
 
 def load_skills_future_framework(file_path):
     """
     Loads the SkillsFuture Framework from an Excel file and returns a DataFrame.
     """
+    import pandas as pd
     framework_df = pd.read_excel(file_path)
     return framework_df 
 
@@ -39,9 +43,7 @@ def extract_keywords_from_job_description(jd_text):
 
 # Define LangChain prompt templates for the chaining process
 # First prompt: Extract skills and responsibilities from the job description
-extract_skills_prompt = PromptTemplate(
-    input_variables=["job_description"],
-    template="""
+extract_skills_template = """
     Given the job description below, identify at most 10 key skills and responsibilities required for this role.
     List them in a strict JSON format as follows:
     [
@@ -53,12 +55,9 @@ extract_skills_prompt = PromptTemplate(
     Job Description:
     {job_description}
     """
-)
 
 # Second prompt: Match extracted responsibilities to the SkillsFuture Framework
-match_skills_prompt = PromptTemplate(
-    input_variables=["extracted_skills", "framework_text"],
-    template="""
+match_skills_template = """
     Based on the extracted skills and responsibilities below (maximum of 8 extracted skills), match each one with the closest relevant skill from the SkillsFuture Framework.
     Output the result in strict JSON format as follows:
     [
@@ -73,18 +72,29 @@ match_skills_prompt = PromptTemplate(
     SkillsFuture Framework:
     {framework_text}
     """
-)
 
-# Create individual LLMChains for each prompt
-extract_chain = LLMChain(llm=llm, prompt=extract_skills_prompt, output_key="extracted_skills")
-match_chain = LLMChain(llm=llm, prompt=match_skills_prompt, output_key="matched_skills")
+@lru_cache(maxsize=None)
+def get_chains():
+    """
+    Builds the extraction and matching LLMChains and the SequentialChain combining them.
+    """
+    from langchain.chains import SequentialChain, LLMChain
+    from langchain.prompts import PromptTemplate
+
+    extract_skills_prompt = PromptTemplate(input_variables=["job_description"], template=extract_skills_template)
+    match_skills_prompt = PromptTemplate(input_variables=["extracted_skills", "framework_text"], template=match_skills_template)
+
+    # Create individual LLMChains for each prompt
+    extract_chain = LLMChain(llm=get_llm(), prompt=extract_skills_prompt, output_key="extracted_skills")
+    match_chain = LLMChain(llm=get_llm(), prompt=match_skills_prompt, output_key="matched_skills")
 
-# Combine them into a SequentialChain
-sequential_chain = SequentialChain(
-    chains=[extract_chain, match_chain],
-    input_variables=["job_description", "framework_text"],
-    output_variables=["matched_skills"]
-)
+    # Combine them into a SequentialChain
+    sequential_chain = SequentialChain(
+        chains=[extract_chain, match_chain],
+        input_variables=["job_description", "framework_text"],
+        output_variables=["matched_skills"]
+    )
+    return extract_chain, match_chain, sequential_chain
 
 def llm_assisted_skill_matching(job_description, framework_df):
     """
@@ -99,6 +109,7 @@ def llm_assisted_skill_matching(job_description, framework_df):
     """
     # Convert the skills framework into a text format the LLM can read
     framework_text = json.dumps(framework_df.to_dict(orient="records"))
+    extract_chain, match_chain, _ = get_chains()
 
     # First, extract skills and responsibilities
     extracted_skills_response = extract_chain.run({"job_description": job_description})
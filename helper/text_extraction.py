@@ -0,0 +1,125 @@
+import os
+import io
+from concurrent.futures import ProcessPoolExecutor, Future
+from helper.cache import CACHE_DIR, content_hash, read_file_bytes
+from helper.concurrency import process_pool_context
+
+# Extracted resume text is cached on disk, keyed by the content hash of the file
+EXTRACTION_CACHE_DIR = os.path.join(CACHE_DIR, "extracted_text")
+
+def extract_text_from_bytes(file_name, file_bytes):
+    """
+    Extracts text from the raw bytes of a .docx or .pdf file.
+
+    Args:
+        file_name (str): Name of the file, used to determine its format.
+        file_bytes (bytes): Contents of the file.
+
+    Returns:
+        str: Extracted text from the file.
+    """
+    # Extensions are compared case-insensitively, as when batch_score.py collects files (e.g. CV.PDF)
+    extension = os.path.splitext(file_name)[1].lower()
+    # Parsers are imported on first use so importing this module stays fast
+    if extension == '.docx':
+        # Read .docx file with python-docx
+        from docx import Document
+        doc = Document(io.BytesIO(file_bytes))
+        return '\n'.join([para.text for para in doc.paragraphs])
+    elif extension == '.pdf':
+        # Read .pdf file using PyPDF2 and join all pages in one pass
+        import PyPDF2
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+        return "".join(text for text in (page.extract_text() for page in pdf_reader.pages) if text)
+    else:
+        raise ValueError("Unsupported file format")
+
+def _cache_path(file_hash, cache_dir):
+    return os.path.join(cache_dir, f"{file_hash}.txt")
+
+def read_cached_text(file_hash, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Returns previously extracted text for a file hash, or None if it has not been extracted yet.
+    """
+    try:
+        with open(_cache_path(file_hash, cache_dir), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def extract_and_cache(file_name, file_bytes, file_hash, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Extracts text from file bytes and stores it in the extraction cache.
+    Runs in worker processes, so it only takes picklable arguments.
+    """
+    text = extract_text_from_bytes(file_name, file_bytes)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{_cache_path(file_hash, cache_dir)}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, _cache_path(file_hash, cache_dir))  # Atomic so concurrent readers never see a partial file
+    return text
+
+def extract_text_from_file(file, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Extracts text from a .docx or .pdf file, reusing the cached text if the same file was parsed before.
+
+    Args:
+        file (UploadedFile): The resume file uploaded by the user.
+        cache_dir (str): Directory of the extraction cache.
+
+    Returns:
+        str: Extracted text from the file.
+    """
+    file_bytes = read_file_bytes(file)
+    file_hash = content_hash(file_bytes)
+    text = read_cached_text(file_hash, cache_dir)
+    if text is None:
+        text = extract_and_cache(file.name, file_bytes, file_hash, cache_dir)
+    return text
+
+class ExtractionPool:
+    """
+    Process pool for CPU-bound resume parsing. Cached files resolve immediately without being reparsed;
+    the rest are parsed in worker processes so large batches of PDFs use all cores.
+    Use as a context manager; submit() returns a Future for the extracted text.
+    """
+
+    def __init__(self, max_workers=None, cache_dir=EXTRACTION_CACHE_DIR):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, file):
+        """
+        Schedules text extraction for a resume file.
+
+        Args:
+            file (UploadedFile): The resume file uploaded by the user.
+
+        Returns:
+            Future: Resolves to the extracted text.
+        """
+        file_bytes = read_file_bytes(file)
+        file_hash = content_hash(file_bytes)
+        text = read_cached_text(file_hash, self.cache_dir)
+        if text is not None:
+            future = Future()
+            future.set_result(text)
+            return future
+
+        # Started on first use so batches served entirely from the cache never spawn processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_pool_context())
+        return self._executor.submit(extract_and_cache, file.name, file_bytes, file_hash, self.cache_dir)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
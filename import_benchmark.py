@@ -0,0 +1,87 @@
+"""
+Measures how long the helper modules imported by streamlit_app.py take to import, on top of Streamlit itself,
+so app startup stays fast as the code grows. Exits with status 1 if the median exceeds the budget.
+
+Example:
+    python import_benchmark.py --repeat 5 --budget 0.5
+"""
+import ast
+import sys
+import argparse
+import statistics
+import subprocess
+
+APP_FILE = "streamlit_app.py"
+BASELINE_MODULES = ("streamlit",)
+DEFAULT_BUDGET_SECONDS = 0.5
+
+def app_helper_modules(app_file=APP_FILE):
+    """
+    Returns the project modules imported by the Streamlit app (helper.* and sibling page modules).
+    """
+    with open(app_file, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+        elif isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+    project_modules = [module for module in modules if module.startswith("helper.") or module in ("about", "methodology", "download")]
+    return list(dict.fromkeys(project_modules))
+
+def time_imports(modules, baseline_modules=BASELINE_MODULES):
+    """
+    Imports the baseline modules, then times importing the given modules, in a fresh interpreter.
+    """
+    code = (
+        "import time\n"
+        + "".join(f"import {module}\n" for module in baseline_modules)
+        + "start = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "print(time.perf_counter() - start)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def slowest_imports(modules, baseline_modules=BASELINE_MODULES, limit=10):
+    """
+    Returns the slowest (cumulative microseconds, module) pairs reported by python -X importtime
+    for the modules imported after the baseline.
+    """
+    code = "".join(f"import {module}\n" for module in (*baseline_modules, "sys"))
+    code += "sys.stderr.write('--- app imports ---\\n')\n" + "".join(f"import {module}\n" for module in modules)
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    app_section = output.stderr.split("--- app imports ---", 1)[-1]
+
+    timings = []
+    for line in app_section.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = [part.strip() for part in line.split(":", 1)[1].split("|")]
+            if cumulative.isdigit():
+                timings.append((int(cumulative), module))
+    return sorted(timings, reverse=True)[:limit]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the Streamlit app's modules.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters to time.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="Maximum allowed median import time in seconds.")
+    args = parser.parse_args(argv)
+
+    modules = app_helper_modules()
+    timings = [time_imports(modules) for _ in range(args.repeat)]
+    median = statistics.median(timings)
+
+    print(f"Modules: {', '.join(modules)}")
+    print(f"Import time on top of {', '.join(BASELINE_MODULES)}: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s")
+    print("Slowest imports (cumulative):")
+    for cumulative, module in slowest_imports(modules):
+        print(f"  {cumulative / 1e6:8.3f}s  {module}")
+
+    if median > args.budget:
+        print(f"FAIL: median import time {median:.3f}s exceeds the {args.budget:.3f}s budget")
+        sys.exit(1)
+    print(f"OK: within the {args.budget:.3f}s budget")
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,19 @@ import streamlit as st
 from streamlit_navigation_bar import st_navbar
 import pandas as pd
 import json
-import zipfile
-import io
 from about import about_page
 from methodology import methodology_page
 from download import download
 from helper.utility import check_password
 from helper.file_handler import process_job_description_file
-from helper.skills_mapping import load_skills_future_framework, llm_assisted_skill_matching, remove_duplicate_skills
-from helper.bulk_resume_processor import process_bulk_resumes
-from helper.scoring import score_all_candidates
-from helper.assessment_generator import generate_assessment_with_answers, create_candidate_docs, create_answer_key_doc
+from helper.skills_mapping import load_skills_future_framework, framework_file_hash, match_job_description
+from helper.pipeline import run_pipeline
+from helper.framework_pruning import LexicalIndex, prune_framework, framework_token_savings, DEFAULT_TOP_K
+from helper.skills_framework import SkillsFramework
+from helper.ranking import LiveRanking
+from helper.instrumentation import RunMetrics, use_metrics
+from helper.cache import CandidateStore, QuestionBank
+from helper.assessment_generator import generate_assessment_with_answers, build_assessment_zip, generate_personalized_assessments, build_personalized_assessment_zip
   
 # region <--------- Streamlit Page Configuration --------->
 
@@ -40,6 +42,29 @@ if not st.session_state.get("authenticated", False):
 
 # endregion <--------- Streamlit Page Configuration --------->
 
+@st.cache_resource(show_spinner=False)
+def load_framework(framework_key, _framework_file):
+    """
+    Loads the SkillsFuture Framework and its pruning index once per framework file (keyed by content hash),
+    shared across reruns and sessions. The Parquet cache in load_skills_future_framework covers restarts.
+    """
+    framework = SkillsFramework(load_skills_future_framework(_framework_file))
+    return framework, LexicalIndex(framework)
+
+@st.cache_resource(show_spinner=False)
+def get_candidate_store():
+    """
+    Shared store of extracted candidate profiles, so recomputing against a new JD only reruns JD matching and scoring.
+    """
+    return CandidateStore()
+
+@st.cache_resource(show_spinner=False)
+def get_question_bank():
+    """
+    Shared bank of per-skill assessment questions, so repeated assessments only generate questions for new skills.
+    """
+    return QuestionBank()
+
 pages = ["Home", "Sample Files", "About", "Methodology"]
 
 styles = {
@@ -122,15 +147,25 @@ elif page == "Home":
             st.session_state.pop("top_n_candidates", None)
             st.session_state.pop("assessment_generated", None)
             st.session_state.pop("candidate_results", None)  # Clear old candidate_results
+            st.session_state.pop("framework_token_savings", None)
 
-            # Process Job Description and Skills Framework
-            with st.spinner("🤖 Loading..."):
-                jd_text, _ = process_job_description_file(jd_file)
-                framework_df = load_skills_future_framework(framework_file)
-                jd_matched_skills = llm_assisted_skill_matching(jd_text, framework_df)
+            # Collect token, latency and cache metrics for this session's run
+            st.session_state["run_metrics"] = RunMetrics()
 
-                # Remove duplicates and save jd_matched_skills in session state
-                jd_matched_skills = remove_duplicate_skills(json.loads(jd_matched_skills))
+            # Process Job Description and Skills Framework
+            with st.spinner("🤖 Loading..."), use_metrics(st.session_state["run_metrics"]):
+                # Only the JD text is used, so the separate parsing call is skipped
+                jd_text, _ = process_job_description_file(jd_file, parse=False)
+                framework, framework_index = load_framework(framework_file_hash(framework_file), framework_file)
+
+                # Only the top-K framework rows relevant to each JD / resume are sent to the LLM.
+                # One call matches the JD and the de-duplicated result is cached per JD content hash.
+                jd_matched_skills = match_job_description(jd_text, framework, top_k=DEFAULT_TOP_K, framework_index=framework_index)
+                st.session_state["framework_token_savings"] = framework_token_savings(
+                    framework, prune_framework(jd_text, framework, DEFAULT_TOP_K, framework_index)
+                )
+
+                # Save jd_matched_skills in session state
                 st.session_state["jd_matched_skills"] = jd_matched_skills
 
                 # Process resumes with progress bar and additional details
@@ -138,33 +173,57 @@ elif page == "Home":
                 progress_bar = st.progress(0)
                 total_files = len(resume_files)
 
-                candidate_results = {}
+                live_ranking_view = st.empty()
 
-                # Process resumes with progress bar
-                for index, resume_file in enumerate(resume_files):
-                    # Show the current progress with file details
-                    current_file = resume_file.name
-                    status_text.markdown(f"**Processing file {index + 1}/{total_files}: `{current_file}`**")
-                    
-                    # Process each resume
-                    result = process_bulk_resumes([resume_file], framework_df)
-                    candidate_results.update(result)
+                candidate_results = {}
+                candidate_scores = {}
+                failed_files = []
+                live_ranking = LiveRanking(top_n)
+
+                # Extraction, LLM matching and scoring run as overlapping pipeline stages; results arrive
+                # in completion order to drive the progress bar. Resumes extracted before are only rescored.
+                status_text.markdown(f"**Processing {total_files} files...**")
+                processed = run_pipeline(resume_files, framework, jd_matched_skills, top_k=DEFAULT_TOP_K, framework_index=framework_index,
+                                         candidate_store=get_candidate_store())
+                for index, (resume_file, candidate_info, score, error) in enumerate(processed):
+                    if error is not None:
+                        failed_files.append(resume_file.name)
+                    else:
+                        # Each candidate is scored as soon as their skills arrive; update the live leaderboard
+                        candidate_name = candidate_info.get("Name", "Unknown Candidate")
+                        candidate_results[candidate_name] = candidate_info
+                        candidate_scores[candidate_name] = score
+                        live_ranking.push(candidate_name, candidate_scores[candidate_name])
+
+                        with live_ranking_view.container():
+                            st.markdown(f"**Current top {top_n} ({len(live_ranking)} of {total_files} scored):**")
+                            st.dataframe(
+                                pd.DataFrame(
+                                    [
+                                        (name, round(score, 2), candidate_results[name].get("Qualification", "N/A"))
+                                        for name, score in live_ranking.top()
+                                    ],
+                                    columns=["Candidate", "Score", "Qualification"],
+                                ),
+                                hide_index=True,
+                            )
                     
                     # Update progress bar and display percentage
                     progress_percentage = (index + 1) / total_files
-                    status_text.markdown(f"**Progress: {int(progress_percentage * 100)}% completed**")
+                    status_text.markdown(f"**Progress: {int(progress_percentage * 100)}% completed (`{resume_file.name}` done)**")
                     progress_bar.progress(progress_percentage)
 
-                # Clear the progress bar and status message once done
+                # Clear the progress bar, status message and live leaderboard once done
                 progress_bar.empty()
                 status_text.empty()
+                live_ranking_view.empty()
+
+                if failed_files:
+                    st.warning(f"Could not process {len(failed_files)} file(s): {', '.join(failed_files)}")
 
                 # Store candidate results in session state
                 st.session_state["candidate_results"] = candidate_results  # <-- Store results here
 
-                # Score candidates and save results
-                candidate_scores = score_all_candidates(candidate_results, jd_matched_skills)
-                
                 # Store the scores in a DataFrame and in session state
                 candidate_df = pd.DataFrame(candidate_scores.items(), columns=["Candidate", "Score"])
                 candidate_df = candidate_df.sort_values(by="Score", ascending=False).reset_index(drop=True)
@@ -172,6 +231,10 @@ elif page == "Home":
 
         # Step 4: Display Results with Expandable Details
         if "candidate_df" in st.session_state:
+            savings = st.session_state.get("framework_token_savings")
+            if savings and savings["saved_tokens"] > 0:
+                st.caption(f"Framework pruning saved {savings['saved_tokens']} of {savings['full_tokens']} framework tokens per prompt.")
+
             st.subheader(f"Top {top_n} Candidates:")
             
             # Display each candidate's details in an expander
@@ -213,6 +276,7 @@ elif page == "Home":
 
             # Generate Assessment Button (reset the generated state if recomputing)
             generate_label = f"Generate {top_n} Assessment Documents"
+            personalize = st.checkbox("Personalise each assessment to the candidate's skill gaps")
             if st.button(generate_label, disabled=st.session_state.get("is_generating_assessment", False)):
                 # Set the flag to indicate assessment generation is in progress
                 st.session_state["is_generating_assessment"] = True
@@ -223,38 +287,34 @@ elif page == "Home":
                 candidate_names = top_candidates["Candidate"].tolist()
                 
                 # Generate assessment with progress bar
-                with st.spinner("✍️ Generating assessment documents..."):
-                    assessment_data = generate_assessment_with_answers(st.session_state["jd_matched_skills"])
+                with st.spinner("✍️ Generating assessment documents..."), use_metrics(st.session_state.setdefault("run_metrics", RunMetrics())):
+                    if personalize:
+                        # Questions target the JD skills each candidate is missing or holds below the required level
+                        candidate_assessments = generate_personalized_assessments(
+                            {name: candidate_results.get(name, {}) for name in candidate_names},
+                            st.session_state["jd_matched_skills"],
+                            question_bank=get_question_bank(),
+                        )
+                    else:
+                        assessment_data = generate_assessment_with_answers(st.session_state["jd_matched_skills"], question_bank=get_question_bank())
 
                     # Progress bar and status text for generating assessment documents
                     assessment_status_text = st.empty()
                     assessment_progress_bar = st.progress(0)
-                    total_candidates = len(candidate_names)
-
-                    for index, candidate_name in enumerate(candidate_names):
-                        # Update status text with the current progress
-                        assessment_status_text.text(f"Generating assessment for {candidate_name} ({index + 1}/{total_candidates})")
-                        
-                        # Create assessment document for the current candidate
-                        create_candidate_docs([candidate_name], assessment_data)
-                        
-                        # Update progress bar
-                        assessment_progress_bar.progress((index + 1) / total_candidates)
+
+                    def show_progress(index, total_candidates, candidate_name):
+                        assessment_status_text.text(f"Generated assessment for {candidate_name} ({index}/{total_candidates})")
+                        assessment_progress_bar.progress(index / total_candidates)
+
+                    # Documents are built in memory and streamed straight into the zip, so sessions never share files on disk
+                    if personalize:
+                        zip_buffer = build_personalized_assessment_zip(candidate_assessments, on_progress=show_progress)
+                    else:
+                        zip_buffer = build_assessment_zip(candidate_names, assessment_data, on_progress=show_progress)
 
                     # Clear the progress bar and status text once done
                     assessment_progress_bar.empty()
                     assessment_status_text.empty()
-
-                    create_answer_key_doc(assessment_data)
-                    
-                    # Zip the generated files
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-                        for candidate_name in candidate_names:
-                            filename = f"{candidate_name.replace(' ', '_')}_Assessment.docx"
-                            zip_file.write(filename)
-                        zip_file.write("Assessment_Answer_Key.docx")
-                    zip_buffer.seek(0)
                     
                     st.session_state["zip_buffer"] = zip_buffer
                     st.session_state["assessment_generated"] = True
@@ -270,3 +330,20 @@ elif page == "Home":
                         file_name="Assessments.zip",
                         mime="application/zip"
                     )
+
+        # Token budget and latency report for the current run
+        if "run_metrics" in st.session_state:
+            with st.expander("Run Metrics (tokens, latency, cache hits)"):
+                metrics_report = st.session_state["run_metrics"].report()
+                totals = metrics_report["totals"]
+                st.write(
+                    f"**LLM calls**: {totals['calls']} ({totals['cache_hits']} cached, {totals['retries']} retries, {totals['errors']} errors) · "
+                    f"**Tokens**: {totals['prompt_tokens']} prompt ({totals['cached_prompt_tokens']} from the provider's prompt cache) / {totals['completion_tokens']} completion"
+                )
+                st.json(metrics_report, expanded=False)
+                st.download_button(
+                    label="Download Metrics (JSON)",
+                    data=json.dumps(metrics_report, indent=2),
+                    file_name="run_metrics.json",
+                    mime="application/json"
+                )
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+import pytest
+import helper.llm
+import helper.bulk_resume_processor
+
+class FakeLLMClient:
+    """
+    Stands in for AsyncLLMClient: respond(messages) returns the completion text for each request.
+    """
+
+    def __init__(self):
+        self.respond = lambda messages: "{}"
+        self.requests = []
+
+    def complete(self, token_estimate=0, on_retry=None, **request):
+        self.requests.append(request)
+        message = SimpleNamespace(content=self.respond(request["messages"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Routes completions to a FakeLLMClient, with the completion cache off and a word count as the token count
+    (the tokenizer needs to download its encoding).
+    """
+    client = FakeLLMClient()
+    monkeypatch.setattr(helper.llm, "get_llm_client", lambda: client)
+    monkeypatch.setattr(helper.llm, "cache_enabled", False)
+    monkeypatch.setattr(helper.llm, "count_tokens_from_message", lambda messages: sum(len(m["content"].split()) for m in messages))
+    monkeypatch.setattr(helper.bulk_resume_processor, "count_tokens", lambda text: len(text.split()))
+    return client
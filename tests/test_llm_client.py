@@ -0,0 +1,81 @@
+import asyncio
+import time
+import httpx
+import openai
+import pytest
+from helper.llm_client import AsyncLLMClient
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+def completion_body(content="Hi"):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
+
+def make_client(handler, **options):
+    # The mock transport stands in for the API endpoint, so nothing leaves the process
+    options.setdefault("base_delay", 0.01)
+    return AsyncLLMClient(api_key="test-key", transport=httpx.MockTransport(handler), **options)
+
+def complete(client, **request):
+    return client.complete(model="gpt-4o-mini", messages=MESSAGES, **request)
+
+def test_rate_limit_is_retried_after_retry_after():
+    calls = []
+    retries = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "Slow down"}})
+        return httpx.Response(200, json=completion_body())
+
+    response = make_client(handler).complete(on_retry=lambda: retries.append(1), model="gpt-4o-mini", messages=MESSAGES)
+    assert response.choices[0].message.content == "Hi"
+    assert len(calls) == 2
+    assert len(retries) == 1
+
+def test_bad_request_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": {"message": "Bad request"}})
+
+    with pytest.raises(openai.BadRequestError):
+        complete(make_client(handler))
+    assert len(calls) == 1
+
+def test_timeout_bounds_the_whole_retry_loop():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=completion_body())
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        complete(make_client(handler), timeout=0.3)
+    assert time.monotonic() - started < 2
+    assert len(calls) == 1
+
+def test_slow_request_is_hedged():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+            return httpx.Response(200, json=completion_body("Slow"))
+        return httpx.Response(200, json=completion_body("Fast"))
+
+    started = time.monotonic()
+    response = complete(make_client(handler, hedge_after=0.05))
+    assert response.choices[0].message.content == "Fast"
+    assert time.monotonic() - started < 2
+    assert len(calls) == 2
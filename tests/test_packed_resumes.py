@@ -0,0 +1,35 @@
+import json
+import re
+import pandas as pd
+from helper.bulk_resume_processor import match_packed_resumes, match_resume_batch
+from helper.skills_framework import SkillsFramework
+
+FRAMEWORK = SkillsFramework(pd.DataFrame([
+    {"Skill": "Python", "Category": "IT", "Proficiency Level": "Basic", "Description": "Writes Python scripts"},
+    {"Skill": "Budgeting", "Category": "Finance", "Proficiency Level": "Basic", "Description": "Plans budgets"},
+]))
+
+RESUMES = ["Alice Tan knows Python", "Bob Lim does budgeting", "Carol Ng knows Python and budgeting"]
+
+def packed_answer(messages, resume_id=int):
+    # Answers every <resume id="n"> in the prompt, in reverse order, echoing the id with the given type
+    resumes = re.findall(r'<resume id="(\d+)">(\w+)', messages[-1]["content"])
+    candidates = [{"Resume ID": resume_id(number), "Name": name, "Skills": []} for number, name in reversed(resumes)]
+    return json.dumps({"Candidates": candidates})
+
+def test_integer_resume_ids_map_back_to_their_resumes(fake_llm):
+    fake_llm.respond = packed_answer
+    candidates = match_packed_resumes(RESUMES, FRAMEWORK)
+    assert [candidate["Name"] for candidate in candidates] == ["Alice", "Bob", "Carol"]
+    assert len(fake_llm.requests) == 1
+
+def test_string_resume_ids_with_whitespace(fake_llm):
+    fake_llm.respond = lambda messages: packed_answer(messages, resume_id=lambda number: f" {number} ")
+    candidates = match_packed_resumes(RESUMES, FRAMEWORK)
+    assert [candidate["Name"] for candidate in candidates] == ["Alice", "Bob", "Carol"]
+
+def test_packed_batch_needs_no_fallback_requests(fake_llm):
+    fake_llm.respond = packed_answer
+    results = match_resume_batch(RESUMES, FRAMEWORK, token_budget=100)
+    assert [(info["Name"], error) for info, error in results] == [("Alice", None), ("Bob", None), ("Carol", None)]
+    assert len(fake_llm.requests) == 1
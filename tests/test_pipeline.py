@@ -0,0 +1,96 @@
+import functools
+import glob
+import io
+import json
+import os
+import re
+import time
+import pytest
+import helper.pipeline
+from helper.cache import CandidateStore
+from helper.pipeline import run_pipeline
+from helper.skills_framework import SkillsFramework
+from helper.skills_mapping import load_skills_future_framework
+from helper.text_extraction import ExtractionPool
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "mydocs")
+JD_MATCHED_SKILLS = [{"Skill": "Python", "Proficiency Level": "Basic", "Importance": 4}]
+
+class InMemoryFile(io.BytesIO):
+    """
+    Minimal stand-in for a Streamlit UploadedFile.
+    """
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+def sample_resumes():
+    paths = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*Resume*.pdf")) + glob.glob(os.path.join(SAMPLE_DIR, "*Resume*.docx")))
+    files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            files.append(InMemoryFile(os.path.basename(path), f.read()))
+    return files
+
+def candidate_answer(messages, delay=0):
+    # Names each candidate after the first words of their resume, so results can be told apart
+    time.sleep(delay)
+    resume_text = re.search(r"<resume_text>(.*?)</resume_text>", messages[-1]["content"], re.S).group(1)
+    name = " ".join(resume_text.split()[:3])
+    return json.dumps({"Name": name, "Skills": [{"Skill": "Python", "Proficiency Level": "Basic"}]})
+
+@pytest.fixture
+def framework():
+    return SkillsFramework(load_skills_future_framework(os.path.join(SAMPLE_DIR, "SkillsFramework_Sample.xlsx")))
+
+@pytest.fixture(autouse=True)
+def extraction_cache(tmp_path, monkeypatch):
+    # Keeps extracted text out of the repository's .cache directory
+    monkeypatch.setattr(helper.pipeline, "ExtractionPool", functools.partial(ExtractionPool, cache_dir=str(tmp_path / "extracted")))
+
+def test_every_file_yields_one_result_and_errors_stay_isolated(fake_llm, framework):
+    fake_llm.respond = candidate_answer
+    resumes = sample_resumes()
+    files = resumes + [InMemoryFile("corrupt.pdf", b"%PDF-1.4 this is not a pdf"), InMemoryFile("notes.txt", b"plain text")]
+
+    results = {resume_file.name: (candidate_info, score, error)
+               for resume_file, candidate_info, score, error in run_pipeline(files, framework, JD_MATCHED_SKILLS, llm_workers=3, extraction_workers=2)}
+
+    assert sorted(results) == sorted(resume_file.name for resume_file in files)
+    for resume_file in resumes:
+        candidate_info, score, error = results[resume_file.name]
+        assert error is None
+        assert candidate_info["Skills"][0]["Skill"] == "Python"
+        assert score > 0
+    for name in ("corrupt.pdf", "notes.txt"):
+        candidate_info, score, error = results[name]
+        assert error is not None and candidate_info is None and score is None
+    assert len(fake_llm.requests) == len(resumes)
+
+def test_closing_early_returns_promptly(fake_llm, framework):
+    fake_llm.respond = functools.partial(candidate_answer, delay=0.2)
+    files = sample_resumes() * 10
+
+    results = run_pipeline(files, framework, JD_MATCHED_SKILLS, llm_workers=2, extraction_workers=2, queue_size=4)
+    next(results)
+    started = time.monotonic()
+    results.close()
+    assert time.monotonic() - started < 5
+    assert len(fake_llm.requests) < len(files)
+
+def test_candidate_store_skips_extraction_and_llm(fake_llm, framework, tmp_path):
+    fake_llm.respond = candidate_answer
+    store = CandidateStore(str(tmp_path / "candidates.sqlite"))
+
+    def run():
+        return {resume_file.name: (candidate_info, score, error)
+                for resume_file, candidate_info, score, error in run_pipeline(sample_resumes(), framework, JD_MATCHED_SKILLS, candidate_store=store)}
+
+    first = run()
+    requests_after_first_run = len(fake_llm.requests)
+    second = run()
+
+    assert second == first
+    assert len(fake_llm.requests) == requests_after_first_run
+    assert store.stats()["hits"] == len(first)
@@ -0,0 +1,9 @@
+from helper.schemas import CandidateProfile, PackedCandidateProfile, to_output_dict
+
+def test_qualification_list_is_joined():
+    profile = CandidateProfile.model_validate({"Name": "Alice Tan", "Qualification": ["BSc", "MSc"]})
+    assert to_output_dict(profile)["Qualification"] == "BSc; MSc"
+
+def test_qualification_string_is_kept():
+    profile = PackedCandidateProfile.model_validate({"Resume ID": 1, "Name": "Alice Tan", "Qualification": "BSc"})
+    assert to_output_dict(profile)["Qualification"] == "BSc"
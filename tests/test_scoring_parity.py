@@ -0,0 +1,52 @@
+import json
+import os
+import random
+import pytest
+from helper.scoring import score_candidate, score_all_candidates
+
+CANDIDATE_RESULTS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "candidate_results.json")
+
+SKILL_NAMES = ["Data Analysis", "Python", "SQL", "Digital Campaigns", "Stakeholder Management", "Budgeting"]
+# Includes levels outside the framework, which are only equal to themselves and never ordered
+LEVELS = ["Basic", "Intermediate", "Advanced", "Expert", "N/A"]
+
+def assert_same_scores(candidate_results, jd_matched_skills):
+    expected = {name: score_candidate(info, jd_matched_skills) for name, info in candidate_results.items()}
+    actual = score_all_candidates(candidate_results, jd_matched_skills)
+    assert list(actual) == list(expected)
+    for name in expected:
+        assert actual[name] == pytest.approx(expected[name], abs=1e-9)
+
+def test_parity_on_candidate_results():
+    with open(CANDIDATE_RESULTS_PATH) as f:
+        candidate_results = json.load(f)
+    candidate_skill_names = sorted({skill["Skill"] for info in candidate_results.values() for skill in info["Skills"]})
+    jd_matched_skills = [
+        {"Skill": name, "Proficiency Level": level, "Importance": importance}
+        for name in candidate_skill_names + ["Skill No Candidate Has"]
+        for level, importance in zip(["Basic", "Intermediate", "Advanced"], [1, 3, 5])
+    ]
+    assert_same_scores(candidate_results, jd_matched_skills)
+
+def random_skill(rng):
+    return {"Skill": rng.choice(SKILL_NAMES), "Proficiency Level": rng.choice(LEVELS)}
+
+def test_parity_on_random_cases():
+    rng = random.Random(0)
+    for _ in range(500):
+        # Duplicate skill names are likely: only the first one of each name is scored
+        candidate_results = {
+            f"Candidate {number}": {"Skills": [random_skill(rng) for _ in range(rng.randint(0, 8))]}
+            for number in range(rng.randint(1, 6))
+        }
+        jd_matched_skills = []
+        for _ in range(rng.randint(1, 8)):
+            jd_skill = random_skill(rng)
+            if rng.random() < 0.8:  # Otherwise the default importance is used
+                jd_skill["Importance"] = rng.randint(1, 5)
+            jd_matched_skills.append(jd_skill)
+        assert_same_scores(candidate_results, jd_matched_skills)
+
+def test_empty_job_description_raises():
+    with pytest.raises(ZeroDivisionError):
+        score_all_candidates({"Candidate": {"Skills": []}}, [])
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+import helper.skills_index
+from helper.skills_index import SkillsIndex, framework_row_text
+from helper.scoring import evaluate_skill_relevance
+
+FRAMEWORK_DF = pd.DataFrame([
+    {"Skill": "Data Analysis", "Category": "Data", "Proficiency Level": "Basic", "Description": "Analyses structured data"},
+    {"Skill": "Budget Planning", "Category": "Finance", "Proficiency Level": "Intermediate", "Description": "Plans yearly budgets"},
+    {"Skill": "Stakeholder Management", "Category": "Business", "Proficiency Level": "Advanced", "Description": "Manages stakeholders"},
+    {"Skill": "Cloud Infrastructure", "Category": "IT", "Proficiency Level": "Basic", "Description": "Runs cloud servers"},
+])
+
+@pytest.fixture
+def stub_index(tmp_path):
+    return SkillsIndex.build(FRAMEWORK_DF, backend="stub", index_dir=str(tmp_path))
+
+def test_saved_matrix_is_reloaded_as_memmap(tmp_path, monkeypatch):
+    first = SkillsIndex.build(FRAMEWORK_DF, backend="stub", index_dir=str(tmp_path))
+
+    embedded = []
+    stub_embedding = helper.skills_index.EMBEDDING_BACKENDS["stub"]
+    monkeypatch.setitem(helper.skills_index.EMBEDDING_BACKENDS, "stub", lambda texts: embedded.append(texts) or stub_embedding(texts))
+    second = SkillsIndex.build(FRAMEWORK_DF, backend="stub", index_dir=str(tmp_path))
+
+    assert embedded == []  # The framework was not embedded again
+    assert isinstance(second.matrix, np.memmap)
+    assert np.array_equal(np.asarray(first.matrix), np.asarray(second.matrix))
+
+def test_top_k_orders_rows_by_similarity(stub_index):
+    query = framework_row_text(FRAMEWORK_DF.iloc[2])
+    indices, scores = stub_index.top_k([query], k=3)
+    assert indices.shape == (1, 3)
+    assert indices[0, 0] == 2
+    assert scores[0, 0] == pytest.approx(1.0, abs=1e-5)
+    assert list(scores[0]) == sorted(scores[0], reverse=True)
+    assert stub_index.shortlist(query, k=1)["Skill"].tolist() == ["Stakeholder Management"]
+
+@pytest.mark.parametrize("candidate_skill, jd_skill, relevance", [
+    ("Data Analysis", "data analysis", 1.0),  # Identical names are resolved without the index
+    ("Stakeholder Management", "Stakeholder Managements", 1.0),
+    ("Data Analysis", "Data Analytics", 0.5),
+    ("Data Analysis", "Budget Planning", 0.0),
+])
+def test_relevance_thresholds(stub_index, candidate_skill, jd_skill, relevance):
+    assert evaluate_skill_relevance({"Skill": candidate_skill}, {"Skill": jd_skill}, skills_index=stub_index) == relevance